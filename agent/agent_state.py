@@ -1,6 +1,7 @@
 """
 Agent State and Schema Definitions for Bug Reproduction Agent
 """
+from functools import cached_property
 from typing import TypedDict, List, Dict, Any, Optional, Annotated
 from pydantic import BaseModel, Field
 import operator
@@ -13,9 +14,19 @@ class ReproductionStep(BaseModel):
     action: str = Field(description="Action to perform (e.g., 'navigate', 'click', 'input', 'verify')")
     target: Optional[str] = Field(default=None, description="Target element or location")
     expected_result: Optional[str] = Field(default=None, description="Expected outcome")
+    data: Optional[str] = Field(default=None, description="Input text, option value or script for the action")
+    parallel_group: Optional[int] = Field(
+        default=None,
+        description="Steps sharing a group id form an independent scenario that may run alongside other groups"
+    )
     actual_result: Optional[str] = Field(default=None, description="Actual outcome after execution")
     status: str = Field(default="pending", description="Status: pending, success, failed, skipped")
     error: Optional[str] = Field(default=None, description="Error message if failed")
+    
+    @cached_property
+    def description_short(self) -> str:
+        """Description truncated for progress lines (not serialized)"""
+        return self.description[:60]
 
 
 class ApplicationDetails(BaseModel):
@@ -65,6 +76,15 @@ class ReproductionResult(BaseModel):
     confidence_score: float = Field(ge=0.0, le=1.0, description="Confidence in reproduction (0-1)")
 
 
+class AnalysisResponse(BaseModel):
+    """Schema the LLM's reproduction analysis must satisfy"""
+    bug_reproduced: bool = Field(description="Whether the executed steps reproduced the bug")
+    root_cause_analysis: str = Field(description="Likely cause of the bug")
+    recommendations: List[str] = Field(default_factory=list, description="Suggested fixes")
+    confidence_score: float = Field(ge=0.0, le=1.0, description="Confidence in the analysis (0-1)")
+    summary: str = Field(default="", description="Brief summary of findings")
+
+
 class AgentState(TypedDict):
     """Main state for the LangGraph agent"""
     # Input
@@ -3,50 +3,321 @@ Browser Automation Module for Bug Reproduction
 Uses Playwright for cross-browser automation
 """
 import asyncio
+import atexit
+import itertools
 import os
+import queue
 import re
-from typing import Dict, Any, List, Optional, Tuple
+import threading
+import time
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple
 from datetime import datetime
-from playwright.async_api import async_playwright, Browser, Page, BrowserContext
+from playwright.async_api import async_playwright, Browser, Page, BrowserContext, Locator
 from agent_state import ReproductionStep
 
+try:
+    import uvloop
+except ImportError:  # uvloop is not available on Windows
+    uvloop = None
+
+# Separates alternative selectors within a single step target
+SELECTOR_SEPARATOR = "||"
+
+# Selector prefixes accepted in step targets, and the Playwright engine prefix
+# each resolved type maps to (id/name are rewritten to CSS by parse_selector)
+SELECTOR_TYPES = frozenset(("css", "xpath", "text", "id", "name"))
+PLAYWRIGHT_ENGINE_PREFIXES = {"css": "", "xpath": "xpath=", "text": "text="}
+
+# Per-action timeouts in milliseconds. Playwright's auto-waiting returns as soon
+# as the element is actionable, so these only bound how long a wrong selector burns.
+NAVIGATION_TIMEOUT_MS = int(os.getenv("NAVIGATION_TIMEOUT_MS", "30000"))
+SELECTOR_TIMEOUT_MS = int(os.getenv("SELECTOR_TIMEOUT_MS", "5000"))
+VERIFY_TIMEOUT_MS = int(os.getenv("VERIFY_TIMEOUT_MS", "3000"))
+
+# Warm BrowserContexts kept by the shared browser session, and how long one may
+# be reused before it is closed to cap memory growth
+CTX_POOL_SIZE = int(os.getenv("CTX_POOL_SIZE", "4"))
+CTX_TTL_SEC = int(os.getenv("CTX_TTL_SEC", "300"))
+
+CONTEXT_OPTIONS = {
+    "viewport": {"width": 1920, "height": 1080},
+    "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+}
+
+# Chromium switches that keep hidden or background pages running at full speed
+# and avoid exhausting a container's small /dev/shm; none change how pages render
+CHROMIUM_ARGS = [
+    "--disable-dev-shm-usage",
+    "--disable-background-timer-throttling",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-renderer-backgrounding",
+]
+
+# Abort image, font and video downloads; selectors and form fills never need
+# them, but screenshots then show broken images
+BLOCK_MEDIA = os.getenv("BLOCK_MEDIA", "false").lower() == "true"
+_MEDIA_URL_GLOB = "**/*.{png,jpg,jpeg,gif,webp,svg,ico,woff,woff2,ttf,otf,mp4,webm}"
+
+
+def new_event_loop() -> asyncio.AbstractEventLoop:
+    """Create an event loop, using uvloop when available"""
+    if uvloop is not None:
+        return uvloop.new_event_loop()
+    return asyncio.new_event_loop()
+
+
+async def launch_browser(playwright, browser_type: str, headless: bool) -> Browser:
+    """Launch a Playwright browser by type name"""
+    if browser_type == "chromium":
+        return await playwright.chromium.launch(headless=headless, args=CHROMIUM_ARGS)
+    elif browser_type == "firefox":
+        return await playwright.firefox.launch(headless=headless)
+    elif browser_type == "webkit":
+        return await playwright.webkit.launch(headless=headless)
+    else:
+        raise ValueError(f"Unknown browser type: {browser_type}")
+
+
+async def _abort_route(route):
+    await route.abort()
+
+
+async def new_browser_context(browser: Browser) -> BrowserContext:
+    """Create a context with the default options, blocking media if BLOCK_MEDIA is set"""
+    if not BLOCK_MEDIA:
+        return await browser.new_context(**CONTEXT_OPTIONS)
+    
+    # A service worker could fetch media without passing through the route
+    context = await browser.new_context(**CONTEXT_OPTIONS, service_workers="block")
+    await context.route(_MEDIA_URL_GLOB, _abort_route)
+    return context
+
+
+class BrowserSession:
+    """
+    Long-lived browser shared by reproduction runs
+    
+    The browser lives on a dedicated event loop in a daemon thread, so it
+    survives between synchronous run_browser_automation calls. Runs check out
+    a warm context (with an about:blank page) from a LIFO pool instead of
+    paying new_context + new_page every time. Used contexts are always closed
+    and replaced by fresh ones, so no state carries over between runs.
+    """
+    
+    def __init__(self, headless: bool = False, browser_type: str = "chromium"):
+        self.headless = headless
+        self.browser_type = browser_type
+        self.playwright = None
+        self.browser: Optional[Browser] = None
+        self._ctx_pool: Optional[asyncio.LifoQueue] = None
+        self._ctx_created: Dict[BrowserContext, float] = {}
+        self._refill_task: Optional[asyncio.Task] = None
+        # Keeps a prewarm and a first run from launching two browsers
+        self._launch_lock = asyncio.Lock()
+        
+        self.loop = new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="browser-session", daemon=True)
+        self._thread.start()
+    
+    def run(self, coro):
+        """Run a coroutine on the session loop and block until it finishes"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+    
+    async def _ensure_browser(self):
+        """Launch (or relaunch after a crash) the shared browser"""
+        async with self._launch_lock:
+            if self.browser is not None and self.browser.is_connected():
+                return
+            
+            if self.playwright is None:
+                self.playwright = await async_playwright().start()
+            self.browser = await launch_browser(self.playwright, self.browser_type, self.headless)
+            self._ctx_pool = asyncio.LifoQueue()
+            self._ctx_created.clear()
+            
+            print(f"✓ Browser started: {self.browser_type}")
+    
+    async def _new_context(self) -> Tuple[BrowserContext, Page]:
+        context = await new_browser_context(self.browser)
+        self._ctx_created[context] = time.monotonic()
+        page = await context.new_page()
+        return context, page
+    
+    def _is_stale(self, context: BrowserContext, page: Page) -> bool:
+        created = self._ctx_created.get(context)
+        return (
+            created is None
+            or time.monotonic() - created > CTX_TTL_SEC
+            or page.is_closed()
+            or len(context.pages) != 1
+        )
+    
+    async def _discard(self, context: BrowserContext):
+        self._ctx_created.pop(context, None)
+        try:
+            await context.close()
+        except Exception:
+            pass
+    
+    async def _refill(self):
+        """Top the pool back up to CTX_POOL_SIZE warm contexts"""
+        while self.browser is not None and self._ctx_pool.qsize() < CTX_POOL_SIZE:
+            try:
+                self._ctx_pool.put_nowait(await self._new_context())
+            except Exception:
+                break
+    
+    def _schedule_refill(self):
+        if self._refill_task is None or self._refill_task.done():
+            self._refill_task = asyncio.create_task(self._refill())
+    
+    async def _warm_up(self):
+        await self._ensure_browser()
+        await self._refill()
+    
+    def prewarm(self):
+        """
+        Launch the browser and fill the context pool in the background
+        
+        Returns immediately; a run that starts before warm-up finishes waits
+        for the same launch instead of starting a second browser. Failures are
+        left for that run to hit and report.
+        """
+        if not self.loop.is_closed():
+            asyncio.run_coroutine_threadsafe(self._warm_up(), self.loop)
+    
+    async def acquire_context(self) -> Tuple[BrowserContext, Page]:
+        """Check out a warm context and its page, creating one if the pool is empty"""
+        await self._ensure_browser()
+        
+        while not self._ctx_pool.empty():
+            context, page = self._ctx_pool.get_nowait()
+            if self._is_stale(context, page):
+                await self._discard(context)
+                continue
+            self._schedule_refill()
+            return context, page
+        
+        context, page = await self._new_context()
+        self._schedule_refill()
+        return context, page
+    
+    async def release_context(self, context: BrowserContext, page: Page):
+        """
+        Close a used context and top the pool back up with a fresh one
+        
+        A used context is never scrubbed and reused: IndexedDB, other origins'
+        storage, service workers and the HTTP cache would survive any reset
+        and could reproduce or mask a bug in the next run.
+        """
+        await self._discard(context)
+        if self._ctx_pool is not None:
+            self._schedule_refill()
+    
+    async def _aclose(self):
+        if self._refill_task is not None:
+            self._refill_task.cancel()
+        for context in list(self._ctx_created):
+            await self._discard(context)
+        if self.browser:
+            await self.browser.close()
+            self.browser = None
+        if self.playwright:
+            await self.playwright.stop()
+            self.playwright = None
+    
+    def close(self):
+        """Close the browser and stop the session loop"""
+        if self.loop.is_closed():
+            return
+        try:
+            self.run(self._aclose())
+        finally:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(timeout=5)
+            self.loop.close()
+        
+        print("✓ Browser stopped")
+
+
+# Shared sessions, one per (browser_type, headless) combination
+_SESSIONS: Dict[Tuple[str, bool], BrowserSession] = {}
+_SESSION_LOCK = threading.Lock()
+
+
+def get_browser_session(headless: bool = False, browser_type: str = "chromium") -> BrowserSession:
+    """Return the process-wide browser session for this browser type and mode"""
+    key = (browser_type, headless)
+    with _SESSION_LOCK:
+        session = _SESSIONS.get(key)
+        if session is None:
+            session = _SESSIONS[key] = BrowserSession(headless=headless, browser_type=browser_type)
+        return session
+
+
+def prewarm_browser_session(headless: bool = False, browser_type: str = "chromium"):
+    """Start launching the shared browser session in the background"""
+    get_browser_session(headless, browser_type).prewarm()
+
+
+def close_browser_session_for(headless: bool = False, browser_type: str = "chromium"):
+    """Close the shared browser session for this browser type and mode, if started"""
+    with _SESSION_LOCK:
+        session = _SESSIONS.pop((browser_type, headless), None)
+    if session is not None:
+        session.close()
+
+
+@atexit.register
+def close_browser_session():
+    """Close every shared browser session that was started"""
+    with _SESSION_LOCK:
+        while _SESSIONS:
+            _, session = _SESSIONS.popitem()
+            session.close()
+
 
 class BrowserAutomation:
     """
     Real browser automation for executing bug reproduction steps
     """
     
-    def __init__(self, headless: bool = False, browser_type: str = "chromium"):
+    def __init__(
+        self,
+        headless: bool = False,
+        browser_type: str = "chromium",
+        session: Optional[BrowserSession] = None
+    ):
         self.headless = headless
         self.browser_type = browser_type
+        self.session = session
         self.browser: Optional[Browser] = None
         self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
         self.screenshots_dir = "screenshots"
         self.playwright = None
         
+        # Per-step debug screenshots cost a capture + PNG encode on every step
+        self.capture_step_screenshots = os.getenv("DEBUG_ARTIFACTS", "false").lower() == "true"
+        
+        # Failure screenshots are taken in the background and awaited in stop()
+        self.capture_failure_screenshots = os.getenv("CAPTURE_FAILURE_SCREENSHOTS", "false").lower() == "true"
+        self._pending_screenshots: List[asyncio.Task] = []
+        
         # Create screenshots directory
         os.makedirs(self.screenshots_dir, exist_ok=True)
     
     async def start(self):
-        """Initialize browser"""
-        self.playwright = await async_playwright().start()
+        """Initialize browser (or check out a warm context from the shared session)"""
+        if self.session:
+            self.context, self.page = await self.session.acquire_context()
+            return
         
-        # Launch browser based on type
-        if self.browser_type == "chromium":
-            self.browser = await self.playwright.chromium.launch(headless=self.headless)
-        elif self.browser_type == "firefox":
-            self.browser = await self.playwright.firefox.launch(headless=self.headless)
-        elif self.browser_type == "webkit":
-            self.browser = await self.playwright.webkit.launch(headless=self.headless)
-        else:
-            raise ValueError(f"Unknown browser type: {self.browser_type}")
+        self.playwright = await async_playwright().start()
+        self.browser = await launch_browser(self.playwright, self.browser_type, self.headless)
         
         # Create context with reasonable defaults
-        self.context = await self.browser.new_context(
-            viewport={"width": 1920, "height": 1080},
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-        )
+        self.context = await new_browser_context(self.browser)
         
         # Create page
         self.page = await self.context.new_page()
@@ -54,7 +325,17 @@ class BrowserAutomation:
         print(f"✓ Browser started: {self.browser_type}")
     
     async def stop(self):
-        """Close browser"""
+        """Close browser (or return the context to the shared session)"""
+        if self._pending_screenshots:
+            await asyncio.gather(*self._pending_screenshots, return_exceptions=True)
+            self._pending_screenshots.clear()
+        
+        if self.session:
+            if self.context:
+                await self.session.release_context(self.context, self.page)
+            self.context = self.page = None
+            return
+        
         if self.page:
             await self.page.close()
         if self.context:
@@ -87,7 +368,7 @@ class BrowserAutomation:
             selector_type = parts[0].lower()
             selector_value = parts[1]
             
-            if selector_type in ["css", "xpath", "text", "id", "name"]:
+            if selector_type in SELECTOR_TYPES:
                 # Convert id and name to CSS selectors
                 if selector_type == "id":
                     return ("css", f"#{selector_value}")
@@ -99,6 +380,47 @@ class BrowserAutomation:
         # Default to CSS
         return ("css", target)
     
+    def locate(self, target: str) -> Locator:
+        """
+        Build one Locator for a step target
+        
+        Alternative selectors separated by "||" (e.g. "css:#email || name:email")
+        are combined into a single Locator, so Playwright resolves every candidate
+        in one browser-side query instead of waiting on them one at a time.
+        Alternatives known to be CSS (css:, id: and name: prefixes) become one
+        comma-separated selector list; everything else is ORed alongside it.
+        """
+        candidates = [c.strip() for c in (target or "").split(SELECTOR_SEPARATOR) if c.strip()]
+        if not candidates:
+            candidates = [target]
+        
+        # Playwright selector -> known to be CSS. "id:email" and "css:#email"
+        # resolve to the same selector, so it is queried once
+        known_css: Dict[str, bool] = {}
+        for candidate in candidates:
+            selector_type, selector_value = self.parse_selector(candidate)
+            selector = PLAYWRIGHT_ENGINE_PREFIXES[selector_type] + selector_value
+            # Unprefixed targets default to CSS but may be XPath ("//...") or an
+            # engine selector ("text=..."), which would break a selector list
+            is_css = selector_type == "css" and bool(candidate) and candidate.split(":", 1)[0].lower() in SELECTOR_TYPES
+            known_css[selector] = known_css.get(selector, False) or is_css
+        
+        css_selectors = [selector for selector, is_css in known_css.items() if is_css]
+        selectors = [selector for selector, is_css in known_css.items() if not is_css]
+        if css_selectors:
+            selectors.insert(0, ", ".join(css_selectors))
+        
+        locator = self.page.locator(selectors[0])
+        for selector in selectors[1:]:
+            locator = locator.or_(self.page.locator(selector))
+        
+        return locator.first
+    
+    def screenshot_path(self, prefix: str, ext: str = "png") -> str:
+        """Build a timestamped screenshot path inside the screenshots directory"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return os.path.join(self.screenshots_dir, f"{prefix}_{timestamp}.{ext}")
+    
     async def execute_step(self, step: ReproductionStep) -> ReproductionStep:
         """
         Execute a single reproduction step
@@ -115,97 +437,58 @@ class BrowserAutomation:
             action = step.action.lower()
             target = step.target
             
-            # Extract data if stored in actual_result
-            data = None
-            if step.actual_result and step.actual_result.startswith("DATA:"):
+            data = step.data
+            
+            # Plans saved before steps carried a data field stored it in actual_result
+            if data is None and step.actual_result and step.actual_result.startswith("DATA:"):
                 data = step.actual_result[5:]
                 step.actual_result = None
             
             print(f"  Executing: {action} on {target}")
             
             if action == "navigate":
-                await self.page.goto(target, wait_until="domcontentloaded", timeout=30000)
+                await self.page.goto(target, wait_until="domcontentloaded", timeout=NAVIGATION_TIMEOUT_MS)
                 step.actual_result = f"Navigated to {target}"
                 step.status = "success"
                 
             elif action == "click":
-                selector_type, selector_value = self.parse_selector(target)
-                
-                if selector_type == "text":
-                    await self.page.click(f"text={selector_value}", timeout=10000)
-                elif selector_type == "xpath":
-                    await self.page.click(f"xpath={selector_value}", timeout=10000)
-                else:
-                    await self.page.click(selector_value, timeout=10000)
-                
+                await self.locate(target).click(timeout=SELECTOR_TIMEOUT_MS)
                 step.actual_result = f"Clicked on {target}"
                 step.status = "success"
                 
             elif action == "input":
-                selector_type, selector_value = self.parse_selector(target)
-                
-                if selector_type == "xpath":
-                    await self.page.fill(f"xpath={selector_value}", data or "", timeout=10000)
-                else:
-                    await self.page.fill(selector_value, data or "", timeout=10000)
-                
+                await self.locate(target).fill(data or "", timeout=SELECTOR_TIMEOUT_MS)
                 step.actual_result = f"Entered text in {target}"
                 step.status = "success"
                 
             elif action == "select":
-                selector_type, selector_value = self.parse_selector(target)
-                
-                if selector_type == "xpath":
-                    await self.page.select_option(f"xpath={selector_value}", data, timeout=10000)
-                else:
-                    await self.page.select_option(selector_value, data, timeout=10000)
-                
+                await self.locate(target).select_option(data, timeout=SELECTOR_TIMEOUT_MS)
                 step.actual_result = f"Selected option '{data}' in {target}"
                 step.status = "success"
                 
             elif action == "wait":
-                selector_type, selector_value = self.parse_selector(target)
-                
-                if selector_type == "text":
-                    await self.page.wait_for_selector(f"text={selector_value}", timeout=10000)
-                elif selector_type == "xpath":
-                    await self.page.wait_for_selector(f"xpath={selector_value}", timeout=10000)
-                else:
-                    await self.page.wait_for_selector(selector_value, timeout=10000)
-                
+                await self.locate(target).wait_for(state="visible", timeout=SELECTOR_TIMEOUT_MS)
                 step.actual_result = f"Element {target} appeared"
                 step.status = "success"
                 
             elif action == "verify":
-                selector_type, selector_value = self.parse_selector(target)
+                locator = self.locate(target)
                 
                 try:
-                    if selector_type == "text":
-                        element = await self.page.wait_for_selector(f"text={selector_value}", timeout=5000)
-                    elif selector_type == "xpath":
-                        element = await self.page.wait_for_selector(f"xpath={selector_value}", timeout=5000)
-                    else:
-                        element = await self.page.wait_for_selector(selector_value, timeout=5000)
-                    
-                    if element:
-                        is_visible = await element.is_visible()
-                        if is_visible:
-                            step.actual_result = f"✓ Element {target} is visible"
-                            step.status = "success"
-                        else:
-                            step.actual_result = f"✗ Element {target} exists but not visible"
-                            step.status = "failed"
-                    else:
-                        step.actual_result = f"✗ Element {target} not found"
-                        step.status = "failed"
+                    await locator.wait_for(state="visible", timeout=VERIFY_TIMEOUT_MS)
+                    step.actual_result = f"✓ Element {target} is visible"
+                    step.status = "success"
                 except Exception as e:
-                    step.actual_result = f"✗ Verification failed: {target} not found"
+                    # Only pay for the extra lookup when verification failed
+                    if await locator.count():
+                        step.actual_result = f"✗ Element {target} exists but not visible"
+                    else:
+                        step.actual_result = f"✗ Verification failed: {target} not found"
                     step.status = "failed"
                     step.error = str(e)
                 
             elif action == "screenshot":
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                screenshot_path = os.path.join(self.screenshots_dir, f"step_{step.step_number}_{timestamp}.png")
+                screenshot_path = self.screenshot_path(f"step_{step.step_number}")
                 await self.page.screenshot(path=screenshot_path, full_page=True)
                 step.actual_result = f"Screenshot saved: {screenshot_path}"
                 step.status = "success"
@@ -220,24 +503,21 @@ class BrowserAutomation:
                 step.status = "skipped"
             
             # Take screenshot after each step for debugging
-            if step.status == "success" and action != "screenshot":
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                screenshot_path = os.path.join(self.screenshots_dir, f"step_{step.step_number}_{timestamp}.png")
-                await self.page.screenshot(path=screenshot_path)
+            if self.capture_step_screenshots and step.status == "success" and action != "screenshot":
+                await self.page.screenshot(path=self.screenshot_path(f"step_{step.step_number}"))
             
         except Exception as e:
             step.status = "failed"
             step.error = f"Execution error: {str(e)}"
             step.actual_result = f"Failed to execute {action} on {target}"
             
-            # Take screenshot on error
-            try:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                screenshot_path = os.path.join(self.screenshots_dir, f"error_step_{step.step_number}_{timestamp}.png")
-                await self.page.screenshot(path=screenshot_path)
+            # Take screenshot on error without holding up the next step
+            if self.capture_failure_screenshots:
+                screenshot_path = self.screenshot_path(f"error_step_{step.step_number}", ext="jpg")
+                self._pending_screenshots.append(asyncio.create_task(
+                    self.page.screenshot(path=screenshot_path, type="jpeg", quality=60)
+                ))
                 step.error += f" (Screenshot: {screenshot_path})"
-            except:
-                pass
         
         return step
     
@@ -253,34 +533,174 @@ class BrowserAutomation:
         }
 
 
-def run_browser_automation(steps: List[ReproductionStep], headless: bool = False) -> List[ReproductionStep]:
+# Reports each step as soon as it has executed
+StepCallback = Optional[Callable[[ReproductionStep], None]]
+
+# Queued by iter_browser_automation once the run has finished
+_RUN_FINISHED = object()
+
+
+def _is_critical_failure(step: ReproductionStep) -> bool:
+    """A failed navigation leaves no page for the following steps to act on"""
+    return step.status == "failed" and step.action == "navigate"
+
+
+async def _run_sequence(
+    automation: BrowserAutomation,
+    steps: List[ReproductionStep],
+    on_step: StepCallback = None
+) -> List[ReproductionStep]:
+    """Execute steps in order on one page, stopping after a failed navigation"""
+    executed_steps = []
+    for step in steps:
+        executed_step = await automation.execute_step(step)
+        executed_steps.append(executed_step)
+        if on_step:
+            on_step(executed_step)
+        
+        # Stop on critical failure
+        if _is_critical_failure(executed_step):
+            print(f"✗ Critical failure at step {executed_step.step_number}, stopping execution")
+            break
+    
+    return executed_steps
+
+
+async def _run_group(
+    session: BrowserSession,
+    steps: List[ReproductionStep],
+    semaphore: asyncio.Semaphore,
+    on_step: StepCallback = None
+) -> List[ReproductionStep]:
+    """Execute one parallel group in its own browser context"""
+    async with semaphore:
+        automation = BrowserAutomation(headless=session.headless, browser_type=session.browser_type, session=session)
+        try:
+            await automation.start()
+            return await _run_sequence(automation, steps, on_step)
+        finally:
+            await automation.stop()
+
+
+async def _run_parallel_groups(
+    session: BrowserSession,
+    steps: List[ReproductionStep],
+    semaphore: asyncio.Semaphore,
+    on_step: StepCallback = None
+) -> List[ReproductionStep]:
+    """Run each parallel group of a block of grouped steps concurrently"""
+    groups: Dict[int, List[ReproductionStep]] = {}
+    for step in steps:
+        groups.setdefault(step.parallel_group, []).append(step)
+    
+    # Longest groups first, so the semaphore never leaves a long group running alone at the end
+    ordered = sorted(groups.values(), key=len, reverse=True)
+    results = await asyncio.gather(
+        *(_run_group(session, group, semaphore, on_step) for group in ordered),
+        return_exceptions=True
+    )
+    
+    ran = set()
+    for group, result in zip(ordered, results):
+        if isinstance(result, BaseException):
+            for step in group:
+                if step.status != "pending":
+                    continue
+                step.status = "failed"
+                step.error = f"Execution error: {str(result)}"
+                if on_step:
+                    on_step(step)
+            ran.update(id(step) for step in group)
+        else:
+            ran.update(id(step) for step in result)
+    
+    # Report in plan order; steps after a failed navigation in their group never ran
+    return [step for step in steps if id(step) in ran]
+
+
+async def _execute_plan(
+    session: BrowserSession,
+    steps: List[ReproductionStep],
+    max_parallel: int,
+    on_step: StepCallback = None
+) -> List[ReproductionStep]:
+    """
+    Execute a plan on the shared session
+    
+    Steps without a parallel_group run in order on one page. A contiguous
+    block of grouped steps is split by group id, and the groups run
+    concurrently, each in its own context, at most max_parallel at a time.
+    """
+    semaphore = asyncio.Semaphore(max_parallel)
+    automation = BrowserAutomation(headless=session.headless, browser_type=session.browser_type, session=session)
+    try:
+        await automation.start()
+        
+        executed_steps = []
+        for grouped, block in itertools.groupby(steps, key=lambda s: s.parallel_group is not None):
+            block = list(block)
+            if grouped:
+                executed_steps.extend(await _run_parallel_groups(session, block, semaphore, on_step))
+                continue
+            
+            executed_block = await _run_sequence(automation, block, on_step)
+            executed_steps.extend(executed_block)
+            # Covers a failed navigation that was the block's last step too
+            if executed_block and _is_critical_failure(executed_block[-1]):
+                break
+        
+        return executed_steps
+    finally:
+        await automation.stop()
+
+
+def run_browser_automation(
+    steps: List[ReproductionStep],
+    headless: bool = False,
+    max_parallel: int = 4,
+    browser_type: str = "chromium"
+) -> List[ReproductionStep]:
     """
     Synchronous wrapper for browser automation
     
     Args:
         steps: List of reproduction steps to execute
         headless: Run browser in headless mode
+        max_parallel: Maximum number of parallel groups executing at once
+        browser_type: chromium, firefox or webkit
     
     Returns:
-        List of executed steps with results
+        List of executed steps with results, in plan order
     """
-    async def _run():
-        automation = BrowserAutomation(headless=headless)
-        try:
-            await automation.start()
-            
-            executed_steps = []
-            for step in steps:
-                executed_step = await automation.execute_step(step)
-                executed_steps.append(executed_step)
-                
-                # Stop on critical failure
-                if executed_step.status == "failed" and executed_step.action == "navigate":
-                    print(f"✗ Critical failure at step {executed_step.step_number}, stopping execution")
-                    break
-            
-            return executed_steps
-        finally:
-            await automation.stop()
+    session = get_browser_session(headless, browser_type)
+    return session.run(_execute_plan(session, steps, max_parallel))
+
+
+def iter_browser_automation(
+    steps: List[ReproductionStep],
+    headless: bool = False,
+    max_parallel: int = 4,
+    browser_type: str = "chromium"
+) -> Iterator[ReproductionStep]:
+    """
+    Like run_browser_automation, but yields each step as soon as it has executed
+    
+    Steps from concurrent parallel groups are yielded in completion order.
+    Errors that abort the run are raised after the steps that did complete.
+    """
+    session = get_browser_session(headless, browser_type)
+    results: "queue.Queue" = queue.Queue()
+    
+    future = asyncio.run_coroutine_threadsafe(
+        _execute_plan(session, steps, max_parallel, on_step=results.put),
+        session.loop
+    )
+    future.add_done_callback(lambda _: results.put(_RUN_FINISHED))
+    
+    while True:
+        item = results.get()
+        if item is _RUN_FINISHED:
+            break
+        yield item
     
-    return asyncio.run(_run())
+    future.result()
@@ -2,6 +2,7 @@
 LangGraph Workflow Orchestrator
 Main agent that coordinates all nodes in the bug reproduction workflow
 """
+import logging
 from typing import Dict, Any, List, Literal
 from langgraph.graph import StateGraph, END
 from agent_state import AgentState
@@ -14,6 +15,8 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+_BANNER = "=" * 60
+
 
 class BugReproductionAgent:
     """
@@ -46,13 +49,19 @@ class BugReproductionAgent:
         self.workflow = self._build_workflow()
         self.app = self.workflow.compile()
         
-        print(f"\n{'='*60}")
+        print(f"\n{_BANNER}")
         print("🤖 Bug Reproduction Agent Initialized")
-        print(f"{'='*60}")
+        print(_BANNER)
         print(f"Mode: {'REAL BROWSER AUTOMATION' if use_real_browser else 'AI SIMULATION'}")
         print(f"JIRA: {os.getenv('JIRA_URL')}")
         print(f"Project: {os.getenv('JIRA_PROJECT_KEY')}")
-        print(f"{'='*60}\n")
+        print(f"{_BANNER}\n")
+    
+    def close(self):
+        """Release the JIRA connections and the execution node's browser session"""
+        self.jira_client.close()
+        self.jira_parser.close()
+        self.executor.close()
     
     def _build_workflow(self) -> StateGraph:
         """Build the LangGraph workflow"""
@@ -125,7 +134,9 @@ class BugReproductionAgent:
     def _generate_report(self, state: AgentState) -> AgentState:
         """Generate final report and optionally post to JIRA"""
         
-        messages = state.get("messages", [])
+        # Lines produced by this node only; the graph's operator.add reducer appends
+        # them to the existing history once the node returns
+        messages: List[str] = []
         
         try:
             result = state.get("reproduction_result")
@@ -134,9 +145,9 @@ class BugReproductionAgent:
             
             # Generate report summary
             report_lines = [
-                "\n" + "="*60,
+                "\n" + _BANNER,
                 "=== FINAL REPRODUCTION REPORT ===",
-                "="*60,
+                _BANNER,
                 f"Issue: {result['issue_key']}",
                 f"Bug Reproduced: {'YES' if result['bug_reproduced'] else 'NO'}",
                 f"Confidence Score: {result['confidence_score']:.0%}",
@@ -148,8 +159,10 @@ class BugReproductionAgent:
                 "Recommendations:",
             ]
             
-            for i, rec in enumerate(result['recommendations'], 1):
-                report_lines.append(f"  {i}. {rec}")
+            if result['recommendations']:
+                report_lines.append("\n".join(
+                    f"  {i}. {rec}" for i, rec in enumerate(result['recommendations'], 1)
+                ))
             
             report_lines.extend([
                 "",
@@ -163,7 +176,7 @@ class BugReproductionAgent:
                 if step.get('error'):
                     report_lines.append(f"    Error: {step['error']}")
             
-            report_lines.append("="*60)
+            report_lines.append(_BANNER)
             
             messages.extend(report_lines)
             
@@ -205,9 +218,9 @@ class BugReproductionAgent:
 *Recommendations*:
 """
         
-        for i, rec in enumerate(result['recommendations'], 1):
-            comment += f"{i}. {rec}\n"
-        
+        comment += "".join(
+            f"{i}. {rec}\n" for i, rec in enumerate(result['recommendations'], 1)
+        )
         comment += f"\n_Generated by AI Bug Reproduction Agent_"
         
         return comment
@@ -296,26 +309,31 @@ def main():
     """
     import sys
     
+    logging.basicConfig(format="%(message)s")
+    
     # Parse arguments
     issue_key = sys.argv[1] if len(sys.argv) > 1 else "KAN-4"
     use_real_browser = "--simulate" not in sys.argv
     
-    print("\n" + "="*60)
+    print("\n" + _BANNER)
     print("🤖 Bug Reproduction Agent - JIRA Edition")
-    print("="*60)
+    print(_BANNER)
     print(f"Issue: {issue_key}")
     print(f"Mode: {'Real Browser' if use_real_browser else 'Simulation'}")
-    print("="*60 + "\n")
+    print(_BANNER + "\n")
     
     # Initialize agent
     agent = BugReproductionAgent(use_real_browser=use_real_browser)
     
     print(agent.get_workflow_diagram())
     print(f"\nStarting bug reproduction for {issue_key}...")
-    print("="*60)
+    print(_BANNER)
     
     # Run agent
-    result = agent.reproduce_bug(issue_key)
+    try:
+        result = agent.reproduce_bug(issue_key)
+    finally:
+        agent.close()
     
     # Print all messages
     print("\n".join(result.get("messages", [])))
@@ -327,7 +345,7 @@ def main():
             print(f"  - {error}")
     
     # Print final status
-    print(f"\n{'='*60}")
+    print(f"\n{_BANNER}")
     print(f"Final Status: {result.get('status', 'unknown').upper()}")
     
     if result.get("reproduction_result"):
@@ -335,7 +353,7 @@ def main():
         print(f"Bug Reproduced: {'YES ✓' if repro_result.get('bug_reproduced') else 'NO ✗'}")
         print(f"Confidence: {repro_result.get('confidence_score', 0):.0%}")
     
-    print(f"{'='*60}\n")
+    print(f"{_BANNER}\n")
 
 
 if __name__ == "__main__":
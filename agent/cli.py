@@ -2,6 +2,7 @@
 FREE Debug Agent - No MCP Server Required
 Direct API integration with Jira and GitHub
 """
+import logging
 import os
 import json
 from typing import Dict, List
@@ -11,12 +12,15 @@ from rich.console import Console
 from rich.panel import Panel
 from rich.markdown import Markdown
 
-from jira_client import SimpleJiraClient
+from jira_client import SimpleJiraClient, adf_to_text
 from github_client import SimpleGitHubClient
 
 load_dotenv()
 console = Console()
 
+# Issue fields read by _create_context; fetching only these keeps responses small
+CONTEXT_FIELDS = ["summary", "description", "status", "priority", "issuetype"]
+
 class FreeDebugAgent:
     """
     FREE Debug Agent for POC
@@ -49,6 +53,10 @@ class FreeDebugAgent:
             console.print(f"[bold red]❌ Initialization Error:[/bold red]\n{str(e)}")
             raise
     
+    def close(self):
+        """Release the JIRA client's pooled connections"""
+        self.jira.close()
+    
     def _show_info(self):
         """Show configuration info"""
         console.print(f"\n[cyan]Jira:[/cyan] {self.jira.url}")
@@ -69,7 +77,7 @@ class FreeDebugAgent:
 **Summary:** {fields.get('summary')}
 
 **Description:**
-{fields.get('description', 'No description')}
+{adf_to_text(fields.get('description')) or 'No description'}
 
 **Status:** {fields.get('status', {}).get('name')}
 **Priority:** {fields.get('priority', {}).get('name', 'None')}
@@ -140,7 +148,7 @@ Be clear, concise, and actionable.""",
         console.print(f"\n[bold yellow]🔍 Investigating {issue_key}...[/bold yellow]\n")
         
         # Get Jira issue
-        issue_data = self.jira.get_issue(issue_key)
+        issue_data = self.jira.get_issue(issue_key, fields=CONTEXT_FIELDS)
         
         # Create context
         context = self._create_context(issue_data=issue_data)
@@ -159,7 +167,7 @@ Be clear, concise, and actionable.""",
         console.print(f"\n[bold yellow]🔬 Analyzing {issue_key} with code...[/bold yellow]\n")
         
         # Get Jira issue
-        issue_data = self.jira.get_issue(issue_key)
+        issue_data = self.jira.get_issue(issue_key, fields=CONTEXT_FIELDS)
         
         # Get recent commits
         commits = self.github.get_recent_commits(5)
@@ -241,7 +249,9 @@ Be specific and provide code examples."""
 
 # Quick test
 if __name__ == "__main__":
+    logging.basicConfig(format="%(message)s")
     agent = FreeDebugAgent()
     
     console.print("\n[bold cyan]Agent ready for testing![/bold cyan]")
-    console.print("\nTry: agent.investigate_bug('KAN-4')\n")
\ No newline at end of file
+    console.print("\nTry: agent.investigate_bug('KAN-4')\n")
+    agent.close()
\ No newline at end of file
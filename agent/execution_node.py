@@ -2,25 +2,203 @@
 Execution and Verification Node
 Executes bug reproduction steps using real browser automation
 """
-import json
-import re
-from typing import Dict, Any, List, Optional
+import difflib
+import logging
+import orjson
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from datetime import datetime
 from agent_state import (
     AgentState, 
+    AnalysisResponse,
     ReproductionPlan,
     ReproductionStep,
     ReproductionResult
 )
-from anthropic import Anthropic
-from browser_automation import run_browser_automation
+from browser_automation import iter_browser_automation, close_browser_session_for, prewarm_browser_session
+from llm_cache import llm_cache_enabled, llm_cache_key, read_llm_cache, write_llm_cache
+from llm_clients import cached_system, get_anthropic_client, get_bedrock_client, iter_bedrock_text
+from llm_json import extract_json_text, read_json_object
 import os
 from dotenv import load_dotenv
-import boto3
-import json as json_lib
+from pydantic import ValidationError
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+_BANNER = "=" * 60
+
+def _parse_json_response(response_text: str) -> Dict[str, Any]:
+    """
+    Parse the JSON object out of an LLM response (fenced or bare)
+    
+    Streamed responses are already cut at the object's closing brace, so once
+    any fence or preamble is skipped the text normally parses as-is; the
+    Python-level brace scan only runs when something trails the object.
+    """
+    start = response_text.find("{")
+    try:
+        return orjson.loads(response_text[start:] if start > 0 else response_text)
+    except orjson.JSONDecodeError:
+        return orjson.loads(extract_json_text(response_text))
+
+
+def _trunc(text: str, limit: int) -> str:
+    """Cut text to limit characters, returning it unchanged (no copy) when it already fits"""
+    return text if len(text) <= limit else text[:limit]
+
+
+# Prefixes step errors caused by the simulator itself rather than the application
+_SIMULATION_ERROR_PREFIX = "Simulation error"
+
+# How closely (difflib ratio) a failing final step's error must match the
+# reported actual behavior for the failure to count as the bug itself
+_SYMPTOM_MATCH_RATIO = 0.6
+
+
+def _matches_reported_behavior(text: Optional[str], actual_behavior: Optional[str]) -> bool:
+    """Whether text reads like the bug's reported actual behavior"""
+    if not text or not actual_behavior:
+        return False
+    matcher = difflib.SequenceMatcher(None, text.lower(), actual_behavior.lower())
+    # The cheap upper bounds rule most pairs out before the full comparison
+    return (
+        matcher.real_quick_ratio() >= _SYMPTOM_MATCH_RATIO
+        and matcher.quick_ratio() >= _SYMPTOM_MATCH_RATIO
+        and matcher.ratio() >= _SYMPTOM_MATCH_RATIO
+    )
+
+
+# Simulated plans remembered per ExecutionNode
+_SIMULATION_CACHE_SIZE = 128
+
+# Output budget for a simulation batch: each step's result is a short JSON
+# entry, so the cap grows with the batch up to the largest one worth waiting on
+_SIMULATION_TOKENS_PER_STEP = 256
+_SIMULATION_MAX_TOKENS = 8192
+
+
+def _simulation_max_tokens(step_count: int) -> int:
+    return min(512 + _SIMULATION_TOKENS_PER_STEP * step_count, _SIMULATION_MAX_TOKENS)
+
+# Longest step text copied verbatim into the analysis prompt
+_SUMMARY_TEXT_LIMIT = 200
+
+# Analysis responses are a few hundred tokens of JSON; the cap bounds a rambling one
+_ANALYSIS_MAX_TOKENS = 1024
+
+# Static instructions sent as a cacheable system prompt; only the issue and
+# step details go into the per-call user message
+_SIMULATION_SYSTEM = """You are simulating the execution of bug reproduction steps, in order.
+
+Based on the bug description and step details, simulate what would happen when executing each step.
+Each step runs after the ones before it, so take their outcomes into account.
+
+Respond in JSON format, with one entry per step:
+{
+    "results": [
+        {
+            "step_number": 1,
+            "status": "success|failed|skipped",
+            "actual_result": "What actually happened during execution",
+            "error": "Error message if failed, null otherwise"
+        }
+    ]
+}
+
+Be realistic in your simulation. If a step would likely trigger the bug based on the context, indicate that in its actual_result."""
+
+_ANALYSIS_SYSTEM = """You are analyzing the results of a bug reproduction attempt.
+
+Analyze the execution results and provide:
+
+1. **Bug Reproduced**: Did we successfully reproduce the bug?
+2. **Root Cause Analysis**: What is likely causing this bug?
+3. **Recommendations**: What steps should be taken to fix it?
+4. **Confidence Score**: How confident are you in this analysis? (0.0 to 1.0)
+
+Respond with the raw JSON object only, no markdown fence or text around it:
+{
+    "bug_reproduced": true|false,
+    "root_cause_analysis": "Detailed analysis of what's causing the bug",
+    "recommendations": [
+        "Recommendation 1",
+        "Recommendation 2"
+    ],
+    "confidence_score": 0.85,
+    "summary": "Brief summary of findings"
+}"""
+
+
+def _format_steps_summary(executed_steps: List[ReproductionStep]) -> str:
+    """Render executed steps as a compact one-line-per-step table for the analysis prompt"""
+    lines = []
+    for step in executed_steps:
+        line = (
+            f"{step.step_number}. [{step.status}] {step.action} - {step.description} | "
+            f"target={step.target!r} "
+            f"expected={_trunc(step.expected_result or '', _SUMMARY_TEXT_LIMIT)!r} "
+            f"actual={_trunc(step.actual_result or '', _SUMMARY_TEXT_LIMIT)!r}"
+        )
+        if step.error:
+            line += f" error={_trunc(step.error, _SUMMARY_TEXT_LIMIT)!r}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def _user_content(prompt: str, context_block: str, cache: bool) -> Any:
+    """
+    Build the user message content
+    
+    The per-issue context block goes first as its own text block so that,
+    with cache=True, everything up to it is cached and only the prompt after
+    it changes between calls for the same issue.
+    """
+    if not context_block:
+        return prompt
+    
+    context_part = {"type": "text", "text": context_block}
+    if cache:
+        context_part["cache_control"] = {"type": "ephemeral"}
+    return [context_part, {"type": "text", "text": prompt}]
+
+
+# Analysis summary reported as a single message at the end of the node
+_ANALYSIS_TMPL = """
+%(bar)s
+=== REPRODUCTION RESULT ===
+%(bar)s
+Bug Reproduced: %(reproduced)s
+Confidence: %(confidence)s
+
+Root Cause Analysis:
+  %(root_cause)s
+
+Recommendations:
+%(recommendations)s"""
+
+# Progress icon and label for each step status
+_STATUS_META: Dict[str, Tuple[str, str]] = {
+    "success": ("✓", "SUCCESS"),
+    "failed": ("✗", "FAILED"),
+    "skipped": ("✗", "SKIPPED"),
+    "pending": ("✗", "PENDING"),
+}
+
+
+def _fmt_step(step: ReproductionStep) -> List[str]:
+    """Format the progress lines reported for one executed step"""
+    status_icon, status_label = _STATUS_META.get(step.status) or ("✗", step.status.upper())
+    lines = [
+        f"\n  Step {step.step_number}: {step.description_short}...",
+        f"    {status_icon} {status_label}: {_trunc(step.actual_result or '', 80)}..."
+    ]
+    if step.error:
+        lines.append(f"    Error: {step.error}")
+    return lines
+
 
 class ExecutionNode:
     """
@@ -28,241 +206,512 @@ class ExecutionNode:
     Uses Playwright to interact with actual applications
     """
     
+    __slots__ = (
+        "use_bedrock",
+        "bedrock",
+        "bedrock_request_options",
+        "model",
+        "anthropic",
+        "use_real_browser",
+        "headless",
+        "max_parallel_steps",
+        "_simulation_cache",
+    )
+    
     def __init__(self, use_real_browser: bool = True):
         self.use_bedrock = os.getenv("USE_BEDROCK", "false").lower() == "true"
         
         if self.use_bedrock:
-            self.bedrock = boto3.client(
-                service_name='bedrock-runtime',
-                region_name=os.getenv("AWS_REGION", "us-east-1"),
-                aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-                aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY")
-            )
+            self.bedrock = get_bedrock_client()
             self.model = os.getenv("BEDROCK_MODEL_ID", "anthropic.claude-3-5-sonnet-20241022-v2:0")
+            
+            # Latency-optimized inference is only offered for some models and regions
+            self.bedrock_request_options = {}
+            if os.getenv("BEDROCK_LATENCY_OPTIMIZED", "false").lower() == "true":
+                self.bedrock_request_options["performanceConfigLatency"] = "optimized"
         else:
-            self.anthropic = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+            self.anthropic = get_anthropic_client()
             self.model = "claude-sonnet-4-20250514"
         
         self.use_real_browser = use_real_browser
         self.headless = os.getenv("HEADLESS_BROWSER", "false").lower() == "true"
+        self.max_parallel_steps = int(os.getenv("STEP_WORKERS", "4"))
+        
+        # Instance-local so simulations never leak between nodes
+        self._simulation_cache: "OrderedDict[Tuple, List[ReproductionStep]]" = OrderedDict()
+        
+        # Browser startup overlaps with JIRA parsing and planning
+        if self.use_real_browser:
+            prewarm_browser_session(self.headless)
+    
+    def close(self):
+        """Shut down this node's browser session and its pooled contexts"""
+        if self.use_real_browser:
+            close_browser_session_for(self.headless)
+    
+    def _stream_text(
+        self,
+        prompt: str,
+        max_tokens: int,
+        system: str,
+        context_block: str = ""
+    ) -> Iterator[str]:
+        """
+        Yield completion text from Claude as it streams in
+        
+        Closing the generator early (e.g. breaking out of a for loop) closes
+        the underlying HTTP stream.
+        """
+        if self.use_bedrock:
+            # boto3 accepts the encoded bytes as-is
+            body = orjson.dumps({
+                "anthropic_version": "bedrock-2023-05-31",
+                "max_tokens": max_tokens,
+                "temperature": 0.3,
+                "system": system,
+                "messages": [{"role": "user", "content": _user_content(prompt, context_block, cache=False)}]
+            })
+            response = self.bedrock.invoke_model_with_response_stream(
+                modelId=self.model,
+                body=body,
+                **self.bedrock_request_options
+            )
+            yield from iter_bedrock_text(response)
+        else:
+            with self.anthropic.messages.stream(
+                model=self.model,
+                max_tokens=max_tokens,
+                temperature=0.3,
+                system=cached_system(system),
+                messages=[{"role": "user", "content": _user_content(prompt, context_block, cache=True)}]
+            ) as stream:
+                yield from stream.text_stream
+    
+    def _complete(self, prompt: str, max_tokens: int, system: str, context_block: str = "") -> str:
+        """
+        Stream a completion from Claude and return its text up to the end of
+        its first JSON object (see llm_json.read_json_object)
+        """
+        return read_json_object(self._stream_text(prompt, max_tokens, system, context_block), max_tokens)
     
     def execute_steps_with_browser(
         self,
         steps: List[ReproductionStep]
-    ) -> List[ReproductionStep]:
+    ) -> Iterator[ReproductionStep]:
         """
         Execute reproduction steps using REAL browser automation
         
         Args:
             steps: List of steps to execute
         
-        Returns:
-            List of executed steps with results
+        Yields:
+            Each executed step as soon as it completes
         """
+        yielded = set()
         try:
-            print(f"\n{'='*60}")
-            print("  REAL BROWSER AUTOMATION - Executing on actual application")
-            print(f"{'='*60}")
+            logger.debug("%s\n  REAL BROWSER AUTOMATION - Executing on actual application\n%s", _BANNER, _BANNER)
             
             # Use Playwright to execute steps
-            executed_steps = run_browser_automation(steps, headless=self.headless)
+            for executed_step in iter_browser_automation(
+                steps,
+                headless=self.headless,
+                max_parallel=self.max_parallel_steps
+            ):
+                yielded.add(id(executed_step))
+                yield executed_step
             
-            print(f"{'='*60}")
-            print(f"  Executed {len(executed_steps)} steps")
-            print(f"{'='*60}\n")
-            
-            return executed_steps
+            logger.debug("%s\n  Executed %d steps\n%s", _BANNER, len(yielded), _BANNER)
             
         except Exception as e:
-            print(f"✗ Browser automation error: {str(e)}")
-            # Mark all steps as failed
+            logger.warning("✗ Browser automation error: %s", e)
+            # Mark the steps that never reported as failed
             for step in steps:
+                if id(step) in yielded:
+                    continue
                 step.status = "failed"
                 step.error = f"Browser automation error: {str(e)}"
                 step.actual_result = "Failed due to automation error"
-            return steps
+                yield step
     
-    def simulate_step_execution(
+    def _build_simulation_prompt(
         self,
-        step: ReproductionStep,
+        steps: List[ReproductionStep],
         context: Dict[str, Any]
-    ) -> ReproductionStep:
+    ) -> Tuple[str, str]:
         """
-        FALLBACK: Simulate execution when real browser is not available
-        Only used if use_real_browser=False
+        Build one prompt that simulates a batch of steps in order
+        
+        Returns:
+            The issue context block (the same for every call on this issue)
+            and the prompt with the previous results and steps to simulate
         """
+        step_details = [
+            {
+                "step_number": step.step_number,
+                "description": step.description,
+                "action": step.action,
+                "target": step.target,
+                "data": step.data,
+                "expected_result": step.expected_result
+            }
+            for step in steps
+        ]
         
-        prompt = f"""You are simulating the execution of a bug reproduction step. 
-
-**Step Details**:
-- Step Number: {step.step_number}
-- Description: {step.description}
-- Action: {step.action}
-- Target: {step.target}
-- Expected Result: {step.expected_result}
-
-**Context**:
+        context_block = f"""**Context**:
 - Issue Key: {context.get('issue_key', 'Unknown')}
 - Application: {context.get('application_name', 'Unknown')}
 - Application URL: {context.get('application_url', 'Unknown')}
 - Environment: {context.get('environment', 'Unknown')}
 - Platform: {context.get('platform', 'Unknown')}
+- Expected Behavior: {context.get('expected_behavior', 'Not specified')}
+- Actual Behavior: {context.get('actual_behavior', 'Not specified')}
+"""
+        
+        return context_block, f"""**Previous Steps Results**:
+{orjson.dumps(context.get('previous_results', []), option=orjson.OPT_INDENT_2).decode()}
 
-**Previous Steps Results**:
-{json.dumps(context.get('previous_results', []), indent=2)}
-
-Based on the bug description and step details, simulate what would happen when executing this step.
-
-Respond in JSON format:
-{{
-    "status": "success|failed|skipped",
-    "actual_result": "What actually happened during execution",
-    "error": "Error message if failed, null otherwise"
-}}
-
-Be realistic in your simulation. If this step would likely trigger the bug based on the context, indicate that in the actual_result.
+**Steps To Simulate**:
+{orjson.dumps(step_details, option=orjson.OPT_INDENT_2).decode()}
 """
+    
+    def _apply_simulation_result(
+        self,
+        step: ReproductionStep,
+        result: Dict[str, Any]
+    ) -> ReproductionStep:
+        """Copy a parsed simulation result onto the step"""
+        step.status = result.get("status", "success")
+        step.actual_result = result.get("actual_result", "")
+        step.error = result.get("error")
+        return step
+    
+    def _mark_simulation_failed(self, step: ReproductionStep, error: Exception) -> ReproductionStep:
+        """Mark a step as failed because it could not be simulated"""
+        step.status = "failed"
+        step.error = f"{_SIMULATION_ERROR_PREFIX}: {str(error)}"
+        step.actual_result = "Could not simulate step execution"
+        return step
+    
+    def _apply_simulation_results(
+        self,
+        steps: List[ReproductionStep],
+        response_text: str
+    ) -> List[ReproductionStep]:
+        """
+        Match a batched simulation response back onto its steps by step number
         
-        try:
-            if self.use_bedrock:
-                body = json_lib.dumps({
-                    "anthropic_version": "bedrock-2023-05-31",
-                    "max_tokens": 2048,
-                    "temperature": 0.3,
-                    "messages": [{"role": "user", "content": prompt}]
-                })
-                response = self.bedrock.invoke_model(modelId=self.model, body=body)
-                response_body = json_lib.loads(response['body'].read())
-                response_text = response_body['content'][0]['text']
+        Returns:
+            Steps the response had no result for
+        """
+        results = _parse_json_response(response_text).get("results", [])
+        by_number = {r.get("step_number"): r for r in results if isinstance(r, dict)}
+        
+        missing = []
+        for step in steps:
+            result = by_number.get(step.step_number)
+            if result is None:
+                missing.append(step)
             else:
-                response = self.anthropic.messages.create(
-                    model=self.model,
-                    max_tokens=2048,
-                    temperature=0.3,
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                response_text = response.content[0].text
-            
-            # Extract JSON
-            json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', response_text, re.DOTALL)
-            if json_match:
-                response_text = json_match.group(1)
-            
-            result = json.loads(response_text)
-            
-            # Update step
-            step.status = result.get("status", "success")
-            step.actual_result = result.get("actual_result", "")
-            step.error = result.get("error")
-            
-            return step
-            
+                self._apply_simulation_result(step, result)
+        return missing
+    
+    def _context_before(
+        self,
+        step: ReproductionStep,
+        steps: List[ReproductionStep],
+        context: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Context for re-simulating one step of a batch, with the outcomes of the
+        earlier steps in its scenario (grouped steps start on a fresh page, so
+        only their own group's steps come before them)
+        """
+        earlier = [
+            {"step": s.step_number, "status": s.status, "result": s.actual_result}
+            for s in steps[:steps.index(step)]
+            if s.parallel_group == step.parallel_group
+        ]
+        return {**context, "previous_results": context.get("previous_results", []) + earlier}
+    
+    def _simulation_cache_key(
+        self,
+        steps: List[ReproductionStep],
+        context: Dict[str, Any]
+    ) -> Tuple:
+        """Key a simulation by the steps and the outcomes of the last three steps before them"""
+        return (
+            context.get("issue_key"),
+            context.get("application_url"),
+            tuple(
+                (s.step_number, s.description, s.action, s.target, s.data, s.expected_result)
+                for s in steps
+            ),
+            tuple((r.get("step"), r.get("status")) for r in context.get("previous_results", [])[-3:])
+        )
+    
+    def _restore_cached_simulation(self, key: Tuple, steps: List[ReproductionStep]) -> bool:
+        """Copy a memoized simulation onto the steps, if there is one"""
+        cached = self._simulation_cache.get(key)
+        if cached is None:
+            return False
+        
+        self._simulation_cache.move_to_end(key)
+        for step, result in zip(steps, cached):
+            step.status = result.status
+            step.actual_result = result.actual_result
+            step.error = result.error
+        return True
+    
+    def _cache_simulation(self, key: Tuple, steps: List[ReproductionStep]):
+        """Memoize a simulation unless a step failed in the simulator itself"""
+        if any((s.error or "").startswith(_SIMULATION_ERROR_PREFIX) for s in steps):
+            return
+        
+        self._simulation_cache[key] = [s.model_copy(deep=True) for s in steps]
+        if len(self._simulation_cache) > _SIMULATION_CACHE_SIZE:
+            self._simulation_cache.popitem(last=False)
+    
+    def simulate_plan_execution(
+        self,
+        steps: List[ReproductionStep],
+        context: Dict[str, Any]
+    ) -> List[ReproductionStep]:
+        """
+        FALLBACK: Simulate execution when real browser is not available
+        Only used if use_real_browser=False
+        
+        All steps are simulated by a single LLM call; only steps the batch
+        response leaves out (or all of them, if it can't be parsed) are
+        re-simulated individually, in order within each scenario so every step
+        sees the outcomes before it. Results are memoized per node, so
+        replaying the same steps after the same outcomes reuses them.
+        """
+        key = self._simulation_cache_key(steps, context)
+        if self._restore_cached_simulation(key, steps):
+            return steps
+        
+        context_block, prompt = self._build_simulation_prompt(steps, context)
+        
+        try:
+            response_text = self._complete(
+                prompt,
+                max_tokens=_simulation_max_tokens(len(steps)),
+                system=_SIMULATION_SYSTEM,
+                context_block=context_block
+            )
+            missing = self._apply_simulation_results(steps, response_text)
         except Exception as e:
-            step.status = "failed"
-            step.error = f"Simulation error: {str(e)}"
-            step.actual_result = "Could not simulate step execution"
-            return step
+            if len(steps) == 1:
+                return [self._mark_simulation_failed(steps[0], e)]
+            missing = steps
+        
+        if len(steps) == 1:
+            for step in missing:
+                self._mark_simulation_failed(step, Exception("no result returned for step"))
+        elif missing:
+            # Independent scenarios (parallel groups) don't see each other's
+            # outcomes, so only they are re-simulated concurrently
+            chains: Dict[Optional[int], List[ReproductionStep]] = {}
+            for step in missing:
+                chains.setdefault(step.parallel_group, []).append(step)
+            
+            if len(chains) == 1:
+                self._resimulate_in_order(missing, steps, context)
+            else:
+                with ThreadPoolExecutor(max_workers=min(len(chains), self.max_parallel_steps)) as pool:
+                    list(pool.map(
+                        lambda chain: self._resimulate_in_order(chain, steps, context),
+                        chains.values()
+                    ))
+        
+        self._cache_simulation(key, steps)
+        return steps
     
-    def analyze_reproduction_results(
+    def _resimulate_in_order(
+        self,
+        chain: List[ReproductionStep],
+        steps: List[ReproductionStep],
+        context: Dict[str, Any]
+    ):
+        """Re-simulate one scenario's missing steps one at a time, each after the outcomes before it"""
+        for step in chain:
+            self.simulate_plan_execution([step], self._context_before(step, steps, context))
+    
+    def simulate_step_execution(
+        self,
+        step: ReproductionStep,
+        context: Dict[str, Any]
+    ) -> ReproductionStep:
+        """Simulate a single step (a batch of one)"""
+        return self.simulate_plan_execution([step], context)[0]
+    
+    def _try_rule_based_analysis(
         self,
         plan: ReproductionPlan,
         executed_steps: List[ReproductionStep],
         context: Dict[str, Any]
+    ) -> Optional[ReproductionResult]:
+        """
+        Decide the outcome without the LLM when the run itself settles it
+        
+        Returns:
+            A result when a deterministic rule applies, else None
+        """
+        executed = [s for s in executed_steps if s.status in ("success", "failed")]
+        failed = [
+            s for s in executed
+            if s.status == "failed" and not (s.error or "").startswith(_SIMULATION_ERROR_PREFIX)
+        ]
+        failed_navigation = next((s for s in failed if s.action == "navigate"), None)
+        bug_reproduced = False
+        confidence = 0.9
+        
+        if not executed:
+            root_cause = "No reproduction steps were executed, so the bug could not be observed."
+            recommendations = [
+                "Check that the plan uses supported actions",
+                "Re-run the reproduction once the plan is corrected"
+            ]
+        elif failed_navigation is not None:
+            root_cause = (
+                f"The application could not be loaded at step {failed_navigation.step_number} "
+                f"({failed_navigation.target}): {failed_navigation.error or failed_navigation.actual_result}. "
+                "The bug could not be observed."
+            )
+            recommendations = [
+                "Verify the application URL and that the environment is reachable",
+                "Re-run the reproduction once the application is available"
+            ]
+        elif (
+            len(failed) == 1
+            and failed[0] is executed[-1]
+            and _matches_reported_behavior(failed[0].error or failed[0].actual_result, context.get("actual_behavior"))
+        ):
+            # Everything up to the last step worked, and it failed the way the report says
+            symptom = failed[0]
+            bug_reproduced = True
+            confidence = 0.8
+            root_cause = (
+                f"Step {symptom.step_number} ({symptom.action} {symptom.target}) failed with the reported "
+                f"behavior: {symptom.error or symptom.actual_result}. "
+                "The code path behind this step needs to be inspected to confirm the cause."
+            )
+            recommendations = [
+                f"Debug the code handling step {symptom.step_number}: {symptom.description}",
+                "Add a regression test that replays this reproduction"
+            ]
+        else:
+            return None
+        
+        return ReproductionResult(
+            issue_key=plan.issue_key,
+            bug_reproduced=bug_reproduced,
+            executed_steps=executed_steps,
+            screenshots=[],
+            logs=[
+                f"{datetime.now().isoformat()}: Reproduction attempt completed",
+                "Outcome determined by rule-based analysis"
+            ],
+            root_cause_analysis=root_cause,
+            recommendations=recommendations,
+            confidence_score=confidence
+        )
+    
+    def _request_analysis(self, context_block: str, prompt: str) -> Tuple[AnalysisResponse, str]:
+        """
+        Ask Claude for the analysis and validate it against AnalysisResponse
+        
+        A response that is not valid JSON or misses the schema gets one retry
+        that tells the model what was wrong; it shares the cached issue context
+        block. Returns the validated analysis and the raw response text.
+        """
+        response_text = self._complete(
+            prompt, max_tokens=_ANALYSIS_MAX_TOKENS, system=_ANALYSIS_SYSTEM, context_block=context_block
+        )
+        try:
+            return AnalysisResponse.model_validate_json(extract_json_text(response_text)), response_text
+        except ValidationError as e:
+            logger.debug("Analysis response rejected, retrying: %s", e)
+            retry_prompt = (
+                f"{prompt}\nYour previous response was rejected:\n{e}\n\n"
+                "Respond again with only the corrected JSON object."
+            )
+        
+        response_text = self._complete(
+            retry_prompt, max_tokens=_ANALYSIS_MAX_TOKENS, system=_ANALYSIS_SYSTEM, context_block=context_block
+        )
+        return AnalysisResponse.model_validate_json(extract_json_text(response_text)), response_text
+    
+    def analyze_reproduction_results(
+        self,
+        plan: ReproductionPlan,
+        executed_steps: List[ReproductionStep],
+        context: Dict[str, Any],
+        cache: bool = True
     ) -> ReproductionResult:
         """
         Analyze all executed steps to determine if bug was reproduced
         and provide root cause analysis
+        
+        With cache=True (and DEBUGGER_NO_CACHE unset), a response for an
+        identical prompt from the last LLM_CACHE_TTL_SEC is reused.
         """
         
-        steps_summary = []
-        for step in executed_steps:
-            steps_summary.append({
-                "step": step.step_number,
-                "description": step.description,
-                "action": step.action,
-                "expected": step.expected_result,
-                "actual": step.actual_result,
-                "status": step.status,
-                "error": step.error
-            })
+        result = self._try_rule_based_analysis(plan, executed_steps, context)
+        if result is not None:
+            return result
         
-        prompt = f"""You are analyzing the results of a bug reproduction attempt.
-
-**Issue**: {plan.issue_key}
+        context_block = f"""**Issue**: {plan.issue_key}
 **Expected Outcome**: {plan.expected_outcome}
 
-**Executed Steps**:
-{json.dumps(steps_summary, indent=2)}
-
 **Original Bug Description**:
 - Expected Behavior: {context.get('expected_behavior', 'Not specified')}
 - Actual Behavior: {context.get('actual_behavior', 'Not specified')}
-
-Analyze the execution results and provide:
-
-1. **Bug Reproduced**: Did we successfully reproduce the bug?
-2. **Root Cause Analysis**: What is likely causing this bug?
-3. **Recommendations**: What steps should be taken to fix it?
-4. **Confidence Score**: How confident are you in this analysis? (0.0 to 1.0)
-
-Respond in JSON format:
-{{
-    "bug_reproduced": true|false,
-    "root_cause_analysis": "Detailed analysis of what's causing the bug",
-    "recommendations": [
-        "Recommendation 1",
-        "Recommendation 2"
-    ],
-    "confidence_score": 0.85,
-    "summary": "Brief summary of findings"
-}}
+"""
+        
+        prompt = f"""**Executed Steps** (step. [status] action - description | details):
+{_format_steps_summary(executed_steps)}
 """
         
         try:
-            if self.use_bedrock:
-                body = json_lib.dumps({
-                    "anthropic_version": "bedrock-2023-05-31",
-                    "max_tokens": 4096,
-                    "temperature": 0.3,
-                    "messages": [{"role": "user", "content": prompt}]
-                })
-                response = self.bedrock.invoke_model(modelId=self.model, body=body)
-                response_body = json_lib.loads(response['body'].read())
-                response_text = response_body['content'][0]['text']
-            else:
-                response = self.anthropic.messages.create(
-                    model=self.model,
-                    max_tokens=4096,
-                    temperature=0.3,
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                response_text = response.content[0].text
+            cache_key = None
+            response_text = None
+            if cache and llm_cache_enabled():
+                cache_key = llm_cache_key(self.model, _ANALYSIS_MAX_TOKENS, _ANALYSIS_SYSTEM + context_block + prompt)
+                response_text = read_llm_cache(cache_key)
             
-            # Extract JSON
-            json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', response_text, re.DOTALL)
-            if json_match:
-                response_text = json_match.group(1)
+            analysis = None
+            if response_text is not None:
+                try:
+                    analysis = AnalysisResponse.model_validate_json(extract_json_text(response_text))
+                except ValidationError:
+                    # Entry written under an older schema; ask again
+                    pass
             
-            analysis = json.loads(response_text)
+            if analysis is None:
+                analysis, response_text = self._request_analysis(context_block, prompt)
+                # Only responses that validated are worth reusing
+                if cache_key:
+                    write_llm_cache(cache_key, response_text)
             
             # Create ReproductionResult
             result = ReproductionResult(
                 issue_key=plan.issue_key,
-                bug_reproduced=analysis.get("bug_reproduced", False),
+                bug_reproduced=analysis.bug_reproduced,
                 executed_steps=executed_steps,
                 screenshots=[],  # Would be populated in real implementation
                 logs=[f"{datetime.now().isoformat()}: Reproduction attempt completed"],
-                root_cause_analysis=analysis.get("root_cause_analysis"),
-                recommendations=analysis.get("recommendations", []),
-                confidence_score=analysis.get("confidence_score", 0.5)
+                root_cause_analysis=analysis.root_cause_analysis,
+                recommendations=analysis.recommendations,
+                confidence_score=analysis.confidence_score
             )
             
             return result
             
         except Exception as e:
             # Create fallback result
-            failed_steps = [s for s in executed_steps if s.status == "failed"]
-            bug_reproduced = len(failed_steps) > 0
+            failed_count = sum(1 for s in executed_steps if s.status == "failed")
+            bug_reproduced = failed_count > 0
             
             result = ReproductionResult(
                 issue_key=plan.issue_key,
@@ -273,7 +722,7 @@ Respond in JSON format:
                     f"{datetime.now().isoformat()}: Reproduction attempt completed",
                     f"Analysis error: {str(e)}"
                 ],
-                root_cause_analysis=f"Could not perform detailed analysis. {len(failed_steps)} steps failed.",
+                root_cause_analysis=f"Could not perform detailed analysis. {failed_count} steps failed.",
                 recommendations=[
                     "Manual investigation required",
                     "Review failed steps for patterns"
@@ -283,113 +732,160 @@ Respond in JSON format:
             
             return result
     
+    def _load_plan(self, state: AgentState) -> ReproductionPlan:
+        """Read the reproduction plan from state (raises ValueError if missing or invalid)"""
+        plan_dict = state.get("reproduction_plan")
+        if not plan_dict:
+            raise ValueError("No reproduction plan found in state")
+        
+        # pydantic-core validates the whole nested plan in one native call, which
+        # is cheaper than rebuilding it field by field with model_construct
+        return ReproductionPlan.model_validate(plan_dict)
+    
+    def _iter_executed_steps(
+        self,
+        plan: ReproductionPlan,
+        context: Dict[str, Any],
+        messages: List[str]
+    ) -> Iterator[ReproductionStep]:
+        """Yield each step once it has been executed (or simulated)"""
+        steps = plan.reproduction_steps
+        if self.use_real_browser:
+            # Execute with real browser automation, reporting each step as it completes
+            yield from self.execute_steps_with_browser(steps)
+            return
+        
+        # Fallback to simulation
+        messages.extend((
+            "⚠ Using simulation mode (set use_real_browser=True for actual execution)",
+            f"\n  Simulating {len(steps)} steps in one batch..."
+        ))
+        executed_steps = self.simulate_plan_execution(steps, context)
+        
+        # Update context with results
+        context["previous_results"] = [
+            {"step": s.step_number, "status": s.status, "result": s.actual_result}
+            for s in executed_steps
+        ]
+        
+        yield from executed_steps
+    
+    def _run_steps(
+        self,
+        plan: ReproductionPlan,
+        context: Dict[str, Any],
+        state: AgentState,
+        messages: List[str]
+    ) -> List[ReproductionStep]:
+        """Execute (or simulate) the plan, logging each step"""
+        executed_steps = []
+        try:
+            for executed_step in self._iter_executed_steps(plan, context, messages):
+                executed_steps.append(executed_step)
+                messages.extend(_fmt_step(executed_step))
+        finally:
+            # Progress is only read once the node returns, so it is written once
+            if executed_steps:
+                state["current_step"] = executed_steps[-1].step_number
+        
+        return executed_steps
+    
+    def _fail(self, state: AgentState, messages: List[str], errors: List[str], error: Exception):
+        """Record a node failure and route the graph to abort"""
+        # Full traceback only when debugging; the state keeps the one-line message
+        logger.debug("Execution node failed", exc_info=error)
+        
+        state["status"] = "failed"
+        error_msg = f"Error in execution node: {str(error)}"
+        errors.append(error_msg)
+        messages.append(f"✗ {error_msg}")
+        state["next_action"] = "abort"
+    
+    def _finish(self, state: AgentState, messages: List[str], errors: List[str]) -> AgentState:
+        """Hand this node's messages and errors back to the graph"""
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("\n".join(messages))
+        
+        state["messages"] = messages
+        state["errors"] = errors
+        return state
+    
     def __call__(self, state: AgentState) -> AgentState:
         """Execute the reproduction and verification node"""
         
-        messages = state.get("messages", [])
-        errors = state.get("errors", [])
+        # Lines produced by this node only; the graph's operator.add reducer appends
+        # them to the existing history once the node returns
+        messages: List[str] = []
+        errors: List[str] = []
+        
+        # Pydantic's ValidationError is a ValueError
+        try:
+            plan = self._load_plan(state)
+        except ValueError as e:
+            self._fail(state, messages, errors, e)
+            return self._finish(state, messages, errors)
+        
+        step_count = len(plan.reproduction_steps)
+        
+        # Update status
+        state["status"] = "executing"
+        messages.append(f"\nExecuting reproduction plan ({step_count} steps)...")
+        
+        # Prepare context
+        parsed_issue = state.get("parsed_issue") or {}
+        app_details = parsed_issue.get("application_details") or {}
+        context = {
+            "issue_key": plan.issue_key,
+            "application_name": app_details.get("name"),
+            "application_url": app_details.get("url"),
+            "environment": app_details.get("environment"),
+            "platform": app_details.get("platform"),
+            "expected_behavior": parsed_issue.get("expected_behavior"),
+            "actual_behavior": parsed_issue.get("actual_behavior"),
+            "previous_results": []
+        }
+        
+        # Execute steps
+        messages.extend((
+            f"\n{_BANNER}",
+            f"Executing {step_count} steps...",
+            f"Mode: {'REAL BROWSER' if self.use_real_browser else 'SIMULATION'}",
+            _BANNER
+        ))
+        
+        # Browser and simulation failures are recorded on the steps themselves,
+        # so reaching these handlers means something unexpected went wrong
+        try:
+            executed_steps = self._run_steps(plan, context, state, messages)
+        except Exception as e:
+            self._fail(state, messages, errors, e)
+            return self._finish(state, messages, errors)
+        
+        # Analyze results
+        messages.append("\nAnalyzing reproduction results...")
+        state["status"] = "analyzing"
         
         try:
-            # Get reproduction plan
-            plan_dict = state.get("reproduction_plan")
-            if not plan_dict:
-                raise Exception("No reproduction plan found in state")
-            
-            plan = ReproductionPlan(**plan_dict)
-            
-            # Update status
-            state["status"] = "executing"
-            messages.append(f"\nExecuting reproduction plan ({len(plan.reproduction_steps)} steps)...")
-            
-            # Prepare context
-            parsed_issue = state.get("parsed_issue", {})
-            context = {
-                "issue_key": plan.issue_key,
-                "application_name": parsed_issue.get("application_details", {}).get("name"),
-                "application_url": parsed_issue.get("application_details", {}).get("url"),
-                "environment": parsed_issue.get("application_details", {}).get("environment"),
-                "platform": parsed_issue.get("application_details", {}).get("platform"),
-                "expected_behavior": parsed_issue.get("expected_behavior"),
-                "actual_behavior": parsed_issue.get("actual_behavior"),
-                "previous_results": []
-            }
-            
-            # Execute steps
-            messages.append(f"\n{'='*60}")
-            messages.append(f"Executing {len(plan.reproduction_steps)} steps...")
-            messages.append(f"Mode: {'REAL BROWSER' if self.use_real_browser else 'SIMULATION'}")
-            messages.append(f"{'='*60}")
-            
-            if self.use_real_browser:
-                # Execute with real browser automation
-                executed_steps = self.execute_steps_with_browser(plan.reproduction_steps)
-                
-                # Log results
-                for executed_step in executed_steps:
-                    status_icon = "✓" if executed_step.status == "success" else "✗"
-                    messages.append(f"\n  Step {executed_step.step_number}: {executed_step.description[:60]}...")
-                    messages.append(f"    {status_icon} {executed_step.status.upper()}: {executed_step.actual_result[:80]}...")
-                    
-                    if executed_step.error:
-                        messages.append(f"    Error: {executed_step.error}")
-                    
-                    state["current_step"] = executed_step.step_number
-            else:
-                # Fallback to simulation
-                messages.append("⚠ Using simulation mode (set use_real_browser=True for actual execution)")
-                executed_steps = []
-                for i, step in enumerate(plan.reproduction_steps):
-                    messages.append(f"\n  Simulating Step {step.step_number}: {step.description[:60]}...")
-                    
-                    executed_step = self.simulate_step_execution(step, context)
-                    executed_steps.append(executed_step)
-                    
-                    # Update context with result
-                    context["previous_results"].append({
-                        "step": executed_step.step_number,
-                        "status": executed_step.status,
-                        "result": executed_step.actual_result
-                    })
-                    
-                    # Log result
-                    status_icon = "✓" if executed_step.status == "success" else "✗"
-                    messages.append(f"    {status_icon} {executed_step.status.upper()}: {executed_step.actual_result[:80]}...")
-                    
-                    if executed_step.error:
-                        messages.append(f"    Error: {executed_step.error}")
-                    
-                    state["current_step"] = i + 1
-            
-            # Analyze results
-            messages.append("\nAnalyzing reproduction results...")
-            state["status"] = "analyzing"
-            
             result = self.analyze_reproduction_results(plan, executed_steps, context)
-            state["reproduction_result"] = result.model_dump()
-            
-            # Log analysis
-            messages.append(f"\n{'='*60}")
-            messages.append("=== REPRODUCTION RESULT ===")
-            messages.append(f"{'='*60}")
-            messages.append(f"Bug Reproduced: {'YES ✓' if result.bug_reproduced else 'NO ✗'}")
-            messages.append(f"Confidence: {result.confidence_score:.0%}")
-            messages.append(f"\nRoot Cause Analysis:")
-            messages.append(f"  {result.root_cause_analysis}")
-            messages.append(f"\nRecommendations:")
-            for i, rec in enumerate(result.recommendations, 1):
-                messages.append(f"  {i}. {rec}")
-            
-            # Set status
-            state["status"] = "completed"
-            state["next_action"] = "report"
-            
         except Exception as e:
-            state["status"] = "failed"
-            error_msg = f"Error in execution node: {str(e)}"
-            errors.append(error_msg)
-            messages.append(f"✗ {error_msg}")
-            state["next_action"] = "abort"
+            self._fail(state, messages, errors, e)
+            return self._finish(state, messages, errors)
         
-        state["messages"] = messages
-        state["errors"] = errors
-        return state
+        state["reproduction_result"] = result.model_dump()
+        
+        # Log analysis
+        messages.append(_ANALYSIS_TMPL % {
+            "bar": _BANNER,
+            "reproduced": "YES ✓" if result.bug_reproduced else "NO ✗",
+            "confidence": f"{result.confidence_score:.0%}",
+            "root_cause": result.root_cause_analysis,
+            "recommendations": "\n".join(
+                f"  {i}. {rec}" for i, rec in enumerate(result.recommendations, 1)
+            )
+        })
+        
+        # Set status
+        state["status"] = "completed"
+        state["next_action"] = "report"
+        
+        return self._finish(state, messages, errors)
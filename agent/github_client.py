@@ -8,6 +8,10 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# Items per API page; the agent reads at most ten commits or search hits, so
+# small pages avoid downloading 30 items (GitHub's default) to use a few
+PER_PAGE = 10
+
 class SimpleGitHubClient:
     """Direct GitHub API client"""
     
@@ -23,7 +27,7 @@ class SimpleGitHubClient:
             )
         
         try:
-            self.github = Github(self.token)
+            self.github = Github(self.token, per_page=PER_PAGE)
             # Test authentication
             self.github.get_user().login
             self.repo = self.github.get_repo(f"{self.owner}/{self.repo_name}")
@@ -38,21 +42,41 @@ class SimpleGitHubClient:
             )
         except Exception as e:
             raise ValueError(f"GitHub connection failed: {str(e)}")
+        
+        # Files fetched so far, revalidated by ETag on later reads
+        self._file_cache = {}
+    
+    def _first(self, paginated, count: int) -> list:
+        """First count items of a paginated result, in a single request when they fit on one page"""
+        if count <= PER_PAGE:
+            return paginated.get_page(0)[:count]
+        return list(paginated[:count])
     
     def get_file_content(self, file_path: str) -> str:
-        """Get file content"""
-        content = self.repo.get_contents(file_path)
+        """
+        Get file content
+        
+        Repeat reads send a conditional request (If-None-Match with the stored
+        ETag); an unchanged file comes back as a bodiless 304 that GitHub does
+        not count against the rate limit.
+        """
+        content = self._file_cache.get(file_path)
+        if content is None:
+            content = self._file_cache[file_path] = self.repo.get_contents(file_path)
+        else:
+            content.update()
         return content.decoded_content.decode('utf-8')
     
     def search_code(self, query: str) -> list:
         """Search code in repository"""
         query_str = f"{query} repo:{self.owner}/{self.repo_name}"
         results = self.github.search_code(query_str)
-        return [{"path": r.path, "score": r.score} for r in results[:10]]
+        return [{"path": r.path, "score": r.score} for r in self._first(results, 10)]
     
     def get_recent_commits(self, count: int = 10) -> list:
         """Get recent commits"""
-        commits = self.repo.get_commits()[:count]
+        # The list payload already carries commit.author, so this is one request
+        commits = self._first(self.repo.get_commits(), count)
         return [{
             "sha": c.sha[:7],
             "message": c.commit.message,
@@ -2,15 +2,92 @@
 Enhanced Jira API Client with comprehensive REST API support
 Focuses on extracting application details and bug reproduction information
 """
+import logging
+import re
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
+from urllib3.util.retry import Retry
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List, Optional
 from dotenv import load_dotenv
 import json
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# JIRA_DEBUG=1 shows per-request details (status codes, fetched fields, detected
+# URLs); the entry points configure where log records go
+if os.getenv("JIRA_DEBUG", "false").lower() in ("1", "true"):
+    logger.setLevel(logging.DEBUG)
+
+# http(s) URLs in free text, ending at whitespace or characters URLs can't contain;
+# capped at 2048 characters so a run of junk in a long description stays cheap
+_URL_RE = re.compile(r'https?://[^\s<>"{}|\\^`\[\]]{1,2048}')
+# Sentence punctuation and the parenthesis adf_to_text puts around link targets
+_URL_TRAILING = ".,;:!?)'"
+
+# Seconds a fetched issue is reused without asking JIRA again; after that it is
+# revalidated with its ETag. 0 revalidates on every call.
+ISSUE_CACHE_TTL_SEC = int(os.getenv("JIRA_CACHE_TTL_SEC", "300"))
+
+# Field keys (lower-cased) that may hold the application URL
+_URL_KEYWORDS = ('url', 'link', 'application')
+
+# Atlassian Document Format leaf blocks that end a line of text (lists, quotes
+# and tables are built from these, so they need no break of their own)
+_ADF_BLOCK_TYPES = frozenset(('paragraph', 'heading', 'codeBlock', 'rule'))
+
+
+def adf_to_text(node: Any) -> str:
+    """
+    Flatten an Atlassian Document Format value (API v3 descriptions and
+    comments) to plain text
+    
+    Walks the tree with an explicit stack, so deeply nested documents cost no
+    recursion. Link targets are kept after their text, and plain strings
+    (API v2 or already-flattened values) are returned unchanged.
+    """
+    if node is None:
+        return ""
+    if not isinstance(node, dict):
+        return str(node)
+    
+    parts = []
+    append = parts.append
+    stack = [node]
+    while stack:
+        item = stack.pop()
+        # Line breaks queued behind block nodes
+        if isinstance(item, str):
+            append(item)
+            continue
+        
+        node_type = item.get('type')
+        if node_type == 'text':
+            text = item.get('text', '')
+            append(text)
+            for mark in item.get('marks') or ():
+                href = (mark.get('attrs') or {}).get('href') if mark.get('type') == 'link' else None
+                if href and href != text:
+                    append(f" ({href})")
+        elif node_type == 'hardBreak':
+            append("\n")
+        elif node_type in ('mention', 'emoji', 'inlineCard'):
+            attrs = item.get('attrs') or {}
+            append(attrs.get('text') or attrs.get('url') or '')
+        
+        if node_type in _ADF_BLOCK_TYPES:
+            stack.append("\n")
+        content = item.get('content')
+        if content:
+            stack.extend(reversed(content))
+    
+    return "".join(parts).strip()
+
 class SimpleJiraClient:
     """
     Enhanced JIRA REST API client for bug reproduction
@@ -36,38 +113,97 @@ class SimpleJiraClient:
         self.auth = (self.email, self.api_token)
         self.headers = {"Accept": "application/json"}
         
+        # One keep-alive connection pool for every call; idempotent requests are
+        # retried with backoff on rate limiting and transient server errors
+        self.session = requests.Session()
+        self.session.auth = self.auth
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=20,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=(429, 500, 502, 503, 504),
+                raise_on_status=False
+            )
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        
+        # (issue key, expand, fields) -> (fetched at, ETag, raw response body).
+        # Hits are decoded afresh, so callers may modify what they get back
+        self._issue_cache: Dict[tuple, tuple] = {}
+        
         print(f"✓ JIRA Client initialized: {self.url}")
         print(f"✓ Project: {self.project_key}")
     
-    def get_issue(self, issue_key: str, expand: List[str] = None) -> Dict[str, Any]:
+    def close(self):
+        """Release the pooled connections"""
+        self.session.close()
+    
+    def __enter__(self) -> "SimpleJiraClient":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def get_issue(
+        self,
+        issue_key: str,
+        expand: List[str] = None,
+        fields: Optional[List[str]] = None,
+        refresh: bool = False
+    ) -> Dict[str, Any]:
         """
         Get a comprehensive JIRA issue with all details
         
         Args:
             issue_key: JIRA issue key (e.g., 'KAN-4')
-            expand: List of fields to expand (comments, attachments, etc.)
+            expand: Extra sections to expand (e.g. renderedFields, names, transitions);
+                none by default, as each one multiplies the response size
+            fields: Only return these fields (default: all, including custom fields)
+            refresh: Fetch from JIRA even if a cached copy is still fresh
         
         Returns:
             Complete JIRA issue data including custom fields
         """
-        expand_params = expand or ["renderedFields", "names", "schema", "transitions"]
         url = f"{self.url}/rest/api/3/issue/{issue_key}"
         
         try:
-            params = {"expand": ",".join(expand_params)}
-            response = requests.get(url, auth=self.auth, headers=self.headers, params=params)
+            params = {}
+            if expand:
+                params["expand"] = ",".join(expand)
+            if fields:
+                params["fields"] = ",".join(fields)
+            
+            cache_key = (issue_key, params.get("expand"), params.get("fields"))
+            cached = None if refresh else self._issue_cache.get(cache_key)
+            if cached and time.monotonic() - cached[0] < ISSUE_CACHE_TTL_SEC:
+                return json.loads(cached[2])
+            
+            # A stale copy is revalidated; JIRA answers 304 with no body if it is unchanged
+            headers = {"If-None-Match": cached[1]} if cached and cached[1] else None
+            response = self.session.get(url, params=params, headers=headers)
+            
+            logger.debug("Fetched JIRA issue %s: HTTP %s", issue_key, response.status_code)
             
-            print(f"✓ Fetching JIRA issue: {issue_key}")
-            print(f"  Status Code: {response.status_code}")
+            if response.status_code == 304:
+                self._issue_cache[cache_key] = (time.monotonic(), cached[1], cached[2])
+                return json.loads(cached[2])
             
             response.raise_for_status()
             issue_data = response.json()
+            self._issue_cache[cache_key] = (time.monotonic(), response.headers.get("ETag"), response.content)
             
-            # Log key information
-            fields = issue_data.get("fields", {})
-            print(f"  Summary: {fields.get('summary', 'N/A')}")
-            print(f"  Type: {fields.get('issuetype', {}).get('name', 'N/A')}")
-            print(f"  Status: {fields.get('status', {}).get('name', 'N/A')}")
+            if logger.isEnabledFor(logging.DEBUG):
+                fields = issue_data.get("fields", {})
+                logger.debug(
+                    "  Summary: %s\n  Type: %s\n  Status: %s",
+                    fields.get('summary', 'N/A'),
+                    (fields.get('issuetype') or {}).get('name', 'N/A'),
+                    (fields.get('status') or {}).get('name', 'N/A')
+                )
             
             return issue_data
             
@@ -78,18 +214,38 @@ class SimpleJiraClient:
         except Exception as e:
             raise Exception(f"Failed to get issue {issue_key}: {str(e)}")
     
-    def search_issues(self, jql: str, max_results: int = 10) -> dict:
+    def search_issues(self, jql: str, max_results: int = 10, start_at: int = 0) -> dict:
         """Search issues with JQL"""
         url = f"{self.url}/rest/api/3/search"
-        response = requests.get(
-            url,
-            auth=self.auth,
-            headers=self.headers,
-            params={"jql": jql, "maxResults": max_results}
-        )
+        response = self.session.get(url, params={"jql": jql, "startAt": start_at, "maxResults": max_results})
         response.raise_for_status()
         return response.json()
     
+    def search_issues_all(self, jql: str, page_size: int = 100, max_workers: int = 5) -> List[Dict[str, Any]]:
+        """
+        Fetch every issue matching a JQL query
+        
+        The first page reports the total; the remaining pages are requested
+        concurrently over the shared session (whose retry policy honours
+        Retry-After on 429s) and merged back in query order.
+        """
+        first = self.search_issues(jql, max_results=page_size)
+        issues = list(first.get("issues", []))
+        total = first.get("total", len(issues))
+        
+        # JIRA may cap maxResults below what was asked for, so page by what it returned
+        page = first.get("maxResults") or page_size
+        offsets = range(page, total, page)
+        if not issues or not offsets:
+            return issues
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(offsets))) as pool:
+            pages = pool.map(lambda offset: self.search_issues(jql, page, start_at=offset), offsets)
+            for result in pages:
+                issues.extend(result.get("issues", []))
+        
+        return issues
+    
     def add_comment(self, issue_key: str, comment: str) -> dict:
         """Add comment to issue"""
         url = f"{self.url}/rest/api/3/issue/{issue_key}/comment"
@@ -103,15 +259,16 @@ class SimpleJiraClient:
                 }]
             }
         }
-        response = requests.post(
-            url,
-            auth=self.auth,
-            headers={**self.headers, "Content-Type": "application/json"},
-            json=body
-        )
+        response = self.session.post(url, json=body)
         response.raise_for_status()
+        self._forget_issue(issue_key)
         return response.json()
     
+    def _forget_issue(self, issue_key: str):
+        """Drop cached copies of an issue after changing it"""
+        for cache_key in [key for key in self._issue_cache if key[0] == issue_key]:
+            self._issue_cache.pop(cache_key, None)
+    
     def get_open_bugs(self, max_results: int = 20) -> dict:
         """Get open bugs"""
         jql = f"project = {self.project_key} AND issuetype = Bug AND status != Done"
@@ -122,14 +279,48 @@ class SimpleJiraClient:
         jql = f"project = {self.project_key} ORDER BY created DESC"
         return self.search_issues(jql, max_results)
     
-    def get_issue_attachments(self, issue_key: str) -> List[Dict[str, Any]]:
+    def get_issue_bundle(self, issue_key: str, include_transitions: bool = False) -> Dict[str, Any]:
+        """
+        Fetch an issue together with its comments (and optionally transitions)
+        
+        The requests are independent, so they run concurrently over the shared
+        session instead of paying one round-trip after another.
+        
+        Returns:
+            Dict with "issue", "comments", "attachments" and, if requested, "transitions"
+        """
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            issue_future = pool.submit(self.get_issue, issue_key)
+            comments_future = pool.submit(self.get_issue_comments, issue_key)
+            transitions_future = pool.submit(self.get_issue_transitions, issue_key) if include_transitions else None
+            
+            issue = issue_future.result()
+            bundle = {
+                "issue": issue,
+                "comments": comments_future.result(),
+                "attachments": self.get_issue_attachments(issue_key, issue_data=issue)
+            }
+            if transitions_future is not None:
+                bundle["transitions"] = transitions_future.result()
+        
+        return bundle
+    
+    def get_issue_attachments(
+        self,
+        issue_key: str,
+        issue_data: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
         """
         Get all attachments for a JIRA issue
         
+        Args:
+            issue_key: JIRA issue key
+            issue_data: Already fetched issue, to avoid requesting it again
+        
         Returns:
             List of attachment metadata (filename, URL, content-type, size)
         """
-        issue = self.get_issue(issue_key)
+        issue = issue_data if issue_data is not None else self.get_issue(issue_key)
         attachments = issue.get("fields", {}).get("attachment", [])
         
         attachment_list = []
@@ -154,7 +345,7 @@ class SimpleJiraClient:
         url = f"{self.url}/rest/api/3/issue/{issue_key}/comment"
         
         try:
-            response = requests.get(url, auth=self.auth, headers=self.headers)
+            response = self.session.get(url)
             response.raise_for_status()
             
             data = response.json()
@@ -184,7 +375,7 @@ class SimpleJiraClient:
         url = f"{self.url}/rest/api/3/issue/{issue_key}/transitions"
         
         try:
-            response = requests.get(url, auth=self.auth, headers=self.headers)
+            response = self.session.get(url)
             response.raise_for_status()
             
             data = response.json()
@@ -212,13 +403,9 @@ class SimpleJiraClient:
         }
         
         try:
-            response = requests.post(
-                url,
-                auth=self.auth,
-                headers={**self.headers, "Content-Type": "application/json"},
-                json=body
-            )
+            response = self.session.post(url, json=body)
             response.raise_for_status()
+            self._forget_issue(issue_key)
             return True
             
         except Exception as e:
@@ -239,34 +426,22 @@ class SimpleJiraClient:
         """
         fields = issue_data.get("fields", {})
         
-        # Check description for URLs
-        description = fields.get("description", "")
-        if description:
-            # Extract URLs from description text
-            import re
-            url_pattern = r'https?://[^\s<>"{}|\\^`\[\]]+'
-            urls = re.findall(url_pattern, str(description))
-            if urls:
-                print(f"  Found URL in description: {urls[0]}")
-                return urls[0]
-        
-        # Check custom fields
-        for field_key, field_value in fields.items():
-            if field_value and isinstance(field_value, str):
-                if any(keyword in field_key.lower() for keyword in ['url', 'link', 'application']):
-                    import re
-                    urls = re.findall(r'https?://[^\s<>"{}|\\^`\[\]]+', field_value)
-                    if urls:
-                        print(f"  Found URL in field {field_key}: {urls[0]}")
-                        return urls[0]
-        
-        # Check environment field
-        environment = fields.get("environment", "")
-        if environment:
-            import re
-            urls = re.findall(r'https?://[^\s<>"{}|\\^`\[\]]+', str(environment))
-            if urls:
-                print(f"  Found URL in environment: {urls[0]}")
-                return urls[0]
+        # Sources in priority order; each is scanned only until its first URL.
+        # ADF values are flattened first, so link targets come out as plain URLs
+        candidates = [("description", adf_to_text(fields.get("description")))]
+        candidates.extend(
+            (f"field {field_key}", field_value)
+            for field_key, field_value in fields.items()
+            if field_value and isinstance(field_value, str)
+            and any(keyword in field_key.lower() for keyword in _URL_KEYWORDS)
+        )
+        candidates.append(("environment", adf_to_text(fields.get("environment"))))
+        
+        for source, text in candidates:
+            match = _URL_RE.search(text)
+            if match:
+                url = match.group(0).rstrip(_URL_TRAILING)
+                logger.debug("Found URL in %s: %s", source, url)
+                return url
         
         return None
\ No newline at end of file
@@ -1,19 +1,74 @@
 """
 JIRA Issue Fetcher and Parser Node
 """
-import json
-import re
-from typing import Dict, Any, Optional, List
+import logging
+import orjson
+from typing import Dict, Any, Iterator, Optional, List
 from agent_state import AgentState, JiraIssueDetails, ApplicationDetails, NodeOutput
-from jira_client import SimpleJiraClient
-from anthropic import Anthropic
+from jira_client import SimpleJiraClient, adf_to_text
+from llm_cache import llm_cache_enabled, llm_cache_key, read_llm_cache, write_llm_cache
+from llm_clients import cached_system, get_anthropic_client, get_bedrock_client, iter_bedrock_text
+from llm_json import extract_json_text, read_json_object
 import os
 from dotenv import load_dotenv
-import boto3
-import json as json_lib
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+_PARSE_MAX_TOKENS = 4096
+
+# Static instructions sent as a cacheable system prompt; only the issue itself
+# goes into the per-call user message
+_PARSE_SYSTEM = """You are an expert at analyzing JIRA bug reports for automated bug reproduction.
+
+**CRITICAL**: This system will automatically access the application URL and execute the reproduction steps.
+Extract ALL necessary information from the JIRA ticket.
+
+Extract the following information:
+
+1. **Reproduction Steps**: Clear, actionable steps that can be automated
+   - Include specific UI elements to interact with
+   - Include specific data to enter
+   - Be explicit about what to click, type, select, etc.
+
+2. **Expected Behavior**: What should happen (the correct behavior)
+
+3. **Actual Behavior**: What actually happens (the bug)
+
+4. **Application Details**: 
+   - **URL**: MANDATORY - Extract the application URL from description, environment, or comments
+   - **name**: Application name
+   - **version**: Application version if mentioned
+   - **environment**: dev/staging/prod
+   - **platform**: web/mobile/desktop
+   - **credentials**: Any login credentials mentioned (username/password)
+   - **additional_info**: Any technical details (browser, OS, etc.)
+
+Respond in JSON format:
+{
+    "reproduction_steps": [
+        "Step 1: Navigate to [specific URL or page]",
+        "Step 2: Click on [specific button/link]",
+        "Step 3: Enter [specific data] in [specific field]",
+        "..."
+    ],
+    "expected_behavior": "detailed expected behavior",
+    "actual_behavior": "detailed actual behavior (bug)",
+    "application_details": {
+        "name": "app name",
+        "version": "version or null",
+        "environment": "environment or null",
+        "url": "MUST be a valid http/https URL",
+        "platform": "web/mobile/desktop",
+        "credentials": {"username": "...", "password": "..."},
+        "additional_info": {"browser": "Chrome", "os": "Windows", ...}
+    }
+}
+
+**IMPORTANT**: The URL field is MANDATORY. If not found in the ticket, return null and I will prompt for it.
+Be as detailed as possible in reproduction steps - they will be executed automatically."""
+
 
 class JiraParserNode:
     """Node for fetching and parsing JIRA issues"""
@@ -24,32 +79,66 @@ class JiraParserNode:
         
         if self.use_bedrock:
             # AWS Bedrock setup
-            self.bedrock = boto3.client(
-                service_name='bedrock-runtime',
-                region_name=os.getenv("AWS_REGION", "us-east-1"),
-                aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-                aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY")
-            )
+            self.bedrock = get_bedrock_client()
             self.model = os.getenv("BEDROCK_MODEL_ID", "anthropic.claude-3-5-sonnet-20241022-v2:0")
             print("✓ Using AWS Bedrock for AI")
         else:
             # Anthropic API setup
-            self.anthropic = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+            self.anthropic = get_anthropic_client()
             self.model = "claude-sonnet-4-20250514"
             print("✓ Using Anthropic API for AI")
     
+    def close(self):
+        """Release the JIRA client's pooled connections"""
+        self.jira_client.close()
+    
     def fetch_jira_issue(self, issue_key: str) -> Dict[str, Any]:
-        """Fetch raw JIRA issue data"""
+        """Fetch raw JIRA issue data with its comments (see SimpleJiraClient.get_issue_bundle)"""
         try:
-            issue_data = self.jira_client.get_issue(issue_key)
-            return issue_data
+            return self.jira_client.get_issue_bundle(issue_key)
         except Exception as e:
             raise Exception(f"Failed to fetch JIRA issue {issue_key}: {str(e)}")
     
-    def parse_with_claude(self, raw_issue: Dict[str, Any]) -> JiraIssueDetails:
+    def _stream_parse(self, prompt: str) -> Iterator[str]:
+        """Stream Claude's reply to the parsing prompt as it is generated"""
+        if self.use_bedrock:
+            # AWS Bedrock API call; boto3 accepts the encoded bytes as-is
+            body = orjson.dumps({
+                "anthropic_version": "bedrock-2023-05-31",
+                "max_tokens": _PARSE_MAX_TOKENS,
+                "temperature": 0,
+                "system": _PARSE_SYSTEM,
+                "messages": [{
+                    "role": "user",
+                    "content": prompt
+                }]
+            })
+            response = self.bedrock.invoke_model_with_response_stream(modelId=self.model, body=body)
+            yield from iter_bedrock_text(response)
+        else:
+            # Anthropic API call
+            with self.anthropic.messages.stream(
+                model=self.model,
+                max_tokens=_PARSE_MAX_TOKENS,
+                temperature=0,
+                system=cached_system(_PARSE_SYSTEM),
+                messages=[{
+                    "role": "user",
+                    "content": prompt
+                }]
+            ) as stream:
+                yield from stream.text_stream
+    
+    def parse_with_claude(
+        self,
+        raw_issue: Dict[str, Any],
+        comments: Optional[List[Dict[str, Any]]] = None
+    ) -> JiraIssueDetails:
         """
         Use Claude to parse JIRA issue and extract structured information
         Focuses on extracting application URL and reproduction steps from JIRA ticket
+        
+        Comments are fetched from JIRA unless already provided.
         """
         
         # Extract key fields
@@ -60,138 +149,61 @@ class JiraParserNode:
         application_url = self.jira_client.extract_application_url(raw_issue)
         
         # Get comments for additional context
-        comments = self.jira_client.get_issue_comments(issue_key)
-        comments_text = "\n".join([f"- {c['author']}: {c['body']}" for c in comments[:5]])
+        if comments is None:
+            comments = self.jira_client.get_issue_comments(issue_key)
+        comments_text = "\n".join([f"- {c['author']}: {adf_to_text(c['body'])}" for c in comments[:5]])
         
-        # Prepare context for Claude
+        # Prepare context for Claude; API v3 returns rich-text fields as ADF documents
         context = {
             "key": issue_key,
             "summary": fields.get("summary", ""),
-            "description": fields.get("description", ""),
+            "description": adf_to_text(fields.get("description")),
             "issue_type": fields.get("issuetype", {}).get("name", ""),
             "status": fields.get("status", {}).get("name", ""),
             "priority": fields.get("priority", {}).get("name", "") if fields.get("priority") else None,
             "labels": fields.get("labels", []),
             "attachments": [att.get("content", "") for att in fields.get("attachment", [])],
-            "environment": fields.get("environment", ""),
+            "environment": adf_to_text(fields.get("environment")),
             "detected_url": application_url
         }
         
-        prompt = f"""You are an expert at analyzing JIRA bug reports for automated bug reproduction.
-
-**CRITICAL**: This system will automatically access the application URL and execute the reproduction steps.
-Extract ALL necessary information from the JIRA ticket.
-
-JIRA Issue: {issue_key}
+        prompt = f"""JIRA Issue: {issue_key}
 Summary: {context['summary']}
 Type: {context['issue_type']}
 Status: {context['status']}
 
 Description:
-{fields.get("description", "No description provided")}
+{context['description'] or "No description provided"}
 
 Environment:
-{context.get('environment', 'Not specified')}
+{context['environment'] or 'Not specified'}
 
 Recent Comments:
 {comments_text or 'No comments'}
 
 {f"Detected Application URL: {application_url}" if application_url else "No URL detected automatically"}
-
-Extract the following information:
-
-1. **Reproduction Steps**: Clear, actionable steps that can be automated
-   - Include specific UI elements to interact with
-   - Include specific data to enter
-   - Be explicit about what to click, type, select, etc.
-
-2. **Expected Behavior**: What should happen (the correct behavior)
-
-3. **Actual Behavior**: What actually happens (the bug)
-
-4. **Application Details**: 
-   - **URL**: MANDATORY - Extract the application URL from description, environment, or comments
-   - **name**: Application name
-   - **version**: Application version if mentioned
-   - **environment**: dev/staging/prod
-   - **platform**: web/mobile/desktop
-   - **credentials**: Any login credentials mentioned (username/password)
-   - **additional_info**: Any technical details (browser, OS, etc.)
-
-Respond in JSON format:
-{{
-    "reproduction_steps": [
-        "Step 1: Navigate to [specific URL or page]",
-        "Step 2: Click on [specific button/link]",
-        "Step 3: Enter [specific data] in [specific field]",
-        "..."
-    ],
-    "expected_behavior": "detailed expected behavior",
-    "actual_behavior": "detailed actual behavior (bug)",
-    "application_details": {{
-        "name": "app name",
-        "version": "version or null",
-        "environment": "environment or null",
-        "url": "MUST be a valid http/https URL",
-        "platform": "web/mobile/desktop",
-        "credentials": {{"username": "...", "password": "..."}},
-        "additional_info": {{"browser": "Chrome", "os": "Windows", ...}}
-    }}
-}}
-
-**IMPORTANT**: The URL field is MANDATORY. If not found in the ticket, return null and I will prompt for it.
-Be as detailed as possible in reproduction steps - they will be executed automatically.
 """
         
         try:
-            if self.use_bedrock:
-                # AWS Bedrock API call
-                body = json_lib.dumps({
-                    "anthropic_version": "bedrock-2023-05-31",
-                    "max_tokens": 4096,
-                    "temperature": 0,
-                    "messages": [{
-                        "role": "user",
-                        "content": prompt
-                    }]
-                })
-                
-                response = self.bedrock.invoke_model(
-                    modelId=self.model,
-                    body=body
-                )
-                
-                response_body = json_lib.loads(response['body'].read())
-                response_text = response_body['content'][0]['text']
-            else:
-                # Anthropic API call
-                response = self.anthropic.messages.create(
-                    model=self.model,
-                    max_tokens=4096,
-                    temperature=0,
-                    messages=[{
-                        "role": "user",
-                        "content": prompt
-                    }]
-                )
-                response_text = response.content[0].text
-            
-            # Try to extract JSON from markdown code blocks if present
-            json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', response_text, re.DOTALL)
-            if json_match:
-                response_text = json_match.group(1)
+            # An unchanged issue (description, comments, detected URL) under the same
+            # instructions gives, at temperature 0, the same answer, so earlier parses are reused
+            cache_key = llm_cache_key(self.model, _PARSE_MAX_TOKENS, _PARSE_SYSTEM + prompt) if llm_cache_enabled() else None
+            response_text = read_llm_cache(cache_key) if cache_key else None
+            cached = response_text is not None
+            if not cached:
+                # Strip markdown fences or prose around the JSON object
+                # Reading stops at the object's closing brace, so trailing prose is never awaited
+                response_text = extract_json_text(read_json_object(self._stream_parse(prompt), _PARSE_MAX_TOKENS))
             
-            parsed_data = json.loads(response_text)
+            parsed_data = orjson.loads(response_text)
             
             # Create ApplicationDetails with validation
             app_details_data = parsed_data.get("application_details", {})
             
             # Ensure URL is present
             app_url = app_details_data.get("url") or application_url
-            if app_url:
-                print(f"  ✓ Application URL: {app_url}")
-            else:
-                print(f"  ⚠ No application URL found in JIRA ticket!")
+            # The node reports the URL (or its absence) in its messages
+            logger.debug("Application URL for %s: %s", issue_key, app_url)
             
             app_details = ApplicationDetails(
                 name=app_details_data.get("name") or "Unknown Application",
@@ -222,9 +234,13 @@ Be as detailed as possible in reproduction steps - they will be executed automat
                 labels=context["labels"]
             )
             
+            # Only a response that validated is reused, so a bad one is retried
+            if cache_key and not cached:
+                write_llm_cache(cache_key, response_text)
+            
             return jira_details
             
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             raise Exception(f"Failed to parse Claude response as JSON: {str(e)}\nResponse: {response_text}")
         except Exception as e:
             raise Exception(f"Failed to parse JIRA issue with Claude: {str(e)}")
@@ -233,16 +249,19 @@ Be as detailed as possible in reproduction steps - they will be executed automat
         """Execute the JIRA parser node"""
         
         issue_key = state["jira_issue_key"]
-        messages = state.get("messages", [])
-        errors = state.get("errors", [])
+        # Lines produced by this node only; the graph's operator.add reducer appends
+        # them to the existing history once the node returns
+        messages: List[str] = []
+        errors: List[str] = []
         
         try:
             # Update status
             state["status"] = "fetching"
             messages.append(f"Fetching JIRA issue: {issue_key}")
             
-            # Fetch raw JIRA data
-            raw_data = self.fetch_jira_issue(issue_key)
+            # Fetch raw JIRA data (issue and comments in parallel)
+            bundle = self.fetch_jira_issue(issue_key)
+            raw_data = bundle["issue"]
             state["raw_jira_data"] = raw_data
             messages.append(f"✓ Successfully fetched JIRA issue {issue_key}")
             
@@ -250,8 +269,9 @@ Be as detailed as possible in reproduction steps - they will be executed automat
             state["status"] = "parsing"
             messages.append("Parsing issue with Claude Sonnet 4.0...")
             
-            parsed_issue = self.parse_with_claude(raw_data)
-            state["parsed_issue"] = parsed_issue.model_dump()
+            parsed_issue = self.parse_with_claude(raw_data, bundle["comments"])
+            # Unset optional fields read back as their defaults, so they are left out of the state
+            state["parsed_issue"] = parsed_issue.model_dump(exclude_none=True)
             
             messages.append(f"✓ Parsed {len(parsed_issue.reproduction_steps)} reproduction steps")
             messages.append(f"  Application: {parsed_issue.application_details.name or 'Not specified'}")
@@ -0,0 +1,50 @@
+"""
+On-disk cache of LLM responses
+Entries are keyed by a hash of model, token budget and prompt, so a prompt
+template change is simply a miss. Set DEBUGGER_NO_CACHE=true to bypass it.
+"""
+import hashlib
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+LLM_CACHE_DIR = Path(os.getenv("LLM_CACHE_DIR", "~/.debugger-agent/llm-cache")).expanduser()
+LLM_CACHE_TTL_SEC = int(os.getenv("LLM_CACHE_TTL_SEC", "86400"))
+
+
+def llm_cache_enabled() -> bool:
+    return os.getenv("DEBUGGER_NO_CACHE", "false").lower() != "true"
+
+
+def llm_cache_key(model: str, max_tokens: int, prompt: str) -> str:
+    return hashlib.blake2b(f"{model}\0{max_tokens}\0{prompt}".encode("utf-8"), digest_size=20).hexdigest()
+
+
+def read_llm_cache(key: str) -> Optional[str]:
+    """Return a cached response, or None if missing, expired or unreadable"""
+    path = LLM_CACHE_DIR / f"{key}.txt"
+    try:
+        if time.time() - path.stat().st_mtime > LLM_CACHE_TTL_SEC:
+            return None
+        return path.read_text(encoding="utf-8")
+    except OSError:
+        return None
+
+
+def write_llm_cache(key: str, response_text: str):
+    """Store a response; a failed write only costs a cache miss later"""
+    path = LLM_CACHE_DIR / f"{key}.txt"
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        LLM_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_text(response_text, encoding="utf-8")
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.debug("Could not write LLM cache entry %s: %s", key, e)
@@ -0,0 +1,79 @@
+"""
+Shared LLM clients
+One Bedrock runtime client and one Anthropic client per process, created on
+first use, so every node reuses the same warm connection pool
+"""
+import os
+import threading
+from typing import Any, Dict, Iterator, List
+import orjson
+from anthropic import Anthropic
+from dotenv import load_dotenv
+import boto3
+from botocore.config import Config
+
+load_dotenv()
+
+_BEDROCK_CLIENT = None
+_ANTHROPIC_CLIENT = None
+_CLIENT_LOCK = threading.Lock()
+
+# Larger, keep-alive HTTPS pool than the botocore default of 10 for concurrent
+# calls; the read timeout still covers a long streamed analysis
+BEDROCK_CONFIG = Config(
+    retries={"max_attempts": int(os.getenv("BEDROCK_MAX_ATTEMPTS", "3")), "mode": "adaptive"},
+    max_pool_connections=int(os.getenv("BEDROCK_MAX_POOL", "32")),
+    tcp_keepalive=True,
+    connect_timeout=10,
+    read_timeout=120
+)
+
+
+def get_bedrock_client():
+    """Return the process-wide Bedrock runtime client"""
+    global _BEDROCK_CLIENT
+    if _BEDROCK_CLIENT is None:
+        with _CLIENT_LOCK:
+            if _BEDROCK_CLIENT is None:
+                _BEDROCK_CLIENT = boto3.client(
+                    service_name='bedrock-runtime',
+                    region_name=os.getenv("AWS_REGION", "us-east-1"),
+                    aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+                    aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+                    config=BEDROCK_CONFIG
+                )
+    return _BEDROCK_CLIENT
+
+
+def get_anthropic_client() -> Anthropic:
+    """Return the process-wide synchronous Anthropic client"""
+    global _ANTHROPIC_CLIENT
+    if _ANTHROPIC_CLIENT is None:
+        with _CLIENT_LOCK:
+            if _ANTHROPIC_CLIENT is None:
+                _ANTHROPIC_CLIENT = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+    return _ANTHROPIC_CLIENT
+
+
+def cached_system(system: str) -> List[Dict[str, Any]]:
+    """Wrap a static system prompt so Anthropic caches it as a reusable prefix"""
+    return [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}]
+
+
+def iter_bedrock_text(response: Dict[str, Any]) -> Iterator[str]:
+    """
+    Yield the text deltas of an invoke_model_with_response_stream response
+    
+    Closing the generator early closes the underlying HTTP stream.
+    """
+    stream = response["body"]
+    try:
+        for event in stream:
+            chunk = event.get("chunk")
+            if not chunk:
+                continue
+            payload = orjson.loads(chunk["bytes"])
+            if payload.get("type") == "content_block_delta":
+                yield payload["delta"].get("text", "")
+    finally:
+        stream.close()
@@ -0,0 +1,95 @@
+"""
+JSON extraction helpers for LLM responses
+Finds the first JSON object in a reply, fenced in markdown or not
+"""
+from typing import Iterator
+
+
+class JsonObjectTracker:
+    """
+    Tracks brace depth over streamed text so a response can be cut off
+    as soon as its first top-level JSON object is complete
+    """
+    
+    def __init__(self):
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escaped = False
+    
+    def feed(self, text: str) -> int:
+        """
+        Consume a chunk of text
+        
+        Returns:
+            Offset just past the closing brace once the object is complete, else -1
+        """
+        for index, char in enumerate(text):
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == "{":
+                self.depth += 1
+                self.started = True
+            elif not self.started:
+                # Ignore quotes and braces in any prose before the object
+                continue
+            elif char == '"':
+                self.in_string = True
+            elif char == "}":
+                self.depth -= 1
+                if self.depth == 0:
+                    return index + 1
+        return -1
+
+
+def extract_json_text(response_text: str) -> str:
+    """
+    Return the text of the first top-level JSON object in an LLM response
+
+    A single linear scan from the first "{" to its matching "}" (braces in
+    strings are skipped), so markdown fences and any prose around the object
+    are dropped. An unterminated object is returned as-is for the JSON parser
+    to report.
+    """
+    start = response_text.find("{")
+    if start < 0:
+        return response_text
+    
+    end = JsonObjectTracker().feed(response_text[start:])
+    return response_text[start:start + end] if end >= 0 else response_text[start:]
+
+
+def incomplete_response(max_tokens: int) -> ValueError:
+    return ValueError(f"Response ended before its JSON object was complete (max_tokens={max_tokens})")
+
+
+def read_json_object(text_stream: Iterator[str], max_tokens: int) -> str:
+    """
+    Consume streamed completion text up to the end of its first JSON object
+    
+    Reading stops as soon as the object is closed, so trailing prose and the
+    closing fence are never waited on; the stream is closed either way. A
+    response that ends before the object closes (typically cut off at
+    max_tokens) raises ValueError instead of being handed to the parser.
+    """
+    tracker = JsonObjectTracker()
+    chunks = []
+    
+    try:
+        for text in text_stream:
+            end = tracker.feed(text)
+            if end >= 0:
+                chunks.append(text[:end])
+                break
+            chunks.append(text)
+        else:
+            raise incomplete_response(max_tokens)
+    finally:
+        text_stream.close()
+    
+    return "".join(chunks)
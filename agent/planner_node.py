@@ -2,8 +2,7 @@
 Bug Reproduction Planner Node
 Creates detailed execution plan for reproducing bugs
 """
-import json
-import re
+import orjson
 from typing import Dict, Any, List
 from agent_state import (
     AgentState, 
@@ -12,11 +11,10 @@ from agent_state import (
     ReproductionStep,
     ApplicationDetails
 )
-from anthropic import Anthropic
+from llm_clients import get_anthropic_client, get_bedrock_client
+from llm_json import extract_json_text
 import os
 from dotenv import load_dotenv
-import boto3
-import json as json_lib
 
 load_dotenv()
 
@@ -28,15 +26,10 @@ class ReproductionPlannerNode:
         self.use_bedrock = os.getenv("USE_BEDROCK", "false").lower() == "true"
         
         if self.use_bedrock:
-            self.bedrock = boto3.client(
-                service_name='bedrock-runtime',
-                region_name=os.getenv("AWS_REGION", "us-east-1"),
-                aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-                aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY")
-            )
+            self.bedrock = get_bedrock_client()
             self.model = os.getenv("BEDROCK_MODEL_ID", "anthropic.claude-3-5-sonnet-20241022-v2:0")
         else:
-            self.anthropic = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+            self.anthropic = get_anthropic_client()
             self.model = "claude-sonnet-4-20250514"
     
     def create_reproduction_plan(
@@ -157,6 +150,7 @@ Create an AUTOMATED reproduction plan with SPECIFIC, EXECUTABLE instructions:
    - Text: "text:Click Here"
    - Name: "name:fieldName"
    - ID: "id:element-id"
+   - Alternatives: "css:#email || name:email || text:Email" (first visible match is used)
 
 3. **Step Structure**:
    - Start with "navigate" to {app_url}
@@ -171,19 +165,26 @@ Create an AUTOMATED reproduction plan with SPECIFIC, EXECUTABLE instructions:
    - Add wait steps before verifying elements
    - Include screenshot steps at critical points
 
+5. **Independent Scenarios** (optional):
+   - Steps normally run in order on one page; omit "parallel_group" for them
+   - Only when the plan checks several independent scenarios (e.g. the same page as different users),
+     give each scenario's steps the same integer "parallel_group"; each group starts on a blank page,
+     so it must begin with its own "navigate" step
+
 Respond ONLY with valid JSON, no additional text or markdown.
 """
         
         try:
             if self.use_bedrock:
-                body = json_lib.dumps({
+                # boto3 accepts the encoded bytes as-is
+                body = orjson.dumps({
                     "anthropic_version": "bedrock-2023-05-31",
                     "max_tokens": 8192,
                     "temperature": 0.3,
                     "messages": [{"role": "user", "content": prompt}]
                 })
                 response = self.bedrock.invoke_model(modelId=self.model, body=body)
-                response_body = json_lib.loads(response['body'].read())
+                response_body = orjson.loads(response['body'].read())
                 response_text = response_body['content'][0]['text']
             else:
                 response = self.anthropic.messages.create(
@@ -194,12 +195,10 @@ Respond ONLY with valid JSON, no additional text or markdown.
                 )
                 response_text = response.content[0].text
             
-            # Extract JSON from markdown code blocks if present
-            json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', response_text, re.DOTALL)
-            if json_match:
-                response_text = json_match.group(1)
+            # Strip markdown fences or prose around the JSON object
+            response_text = extract_json_text(response_text)
             
-            parsed_plan = json.loads(response_text)
+            parsed_plan = orjson.loads(response_text)
             
             # Convert to ReproductionStep objects with validation
             repro_steps = []
@@ -208,19 +207,24 @@ Respond ONLY with valid JSON, no additional text or markdown.
                 if not step_data.get("action"):
                     raise Exception(f"Step {step_data.get('step_number')} missing action")
                 
+                # Ignore anything but a plain integer group id (e.g. booleans or strings)
+                parallel_group = step_data.get("parallel_group")
+                # Structured data (e.g. form fields) is kept as JSON, not a Python repr
+                data = step_data.get("data")
+                if data is not None and not isinstance(data, str):
+                    data = orjson.dumps(data).decode()
+                
                 step = ReproductionStep(
                     step_number=step_data.get("step_number", len(repro_steps) + 1),
                     description=step_data.get("description", ""),
                     action=step_data.get("action", "execute"),
                     target=step_data.get("target"),
                     expected_result=step_data.get("expected_result"),
+                    data=data,
+                    parallel_group=parallel_group if type(parallel_group) is int else None,
                     status="pending"
                 )
                 
-                # Store additional data in actual_result field temporarily
-                if step_data.get("data"):
-                    step.actual_result = f"DATA:{step_data['data']}"
-                
                 repro_steps.append(step)
             
             if not repro_steps:
@@ -237,7 +241,7 @@ Respond ONLY with valid JSON, no additional text or markdown.
             
             return plan
             
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             raise Exception(f"Failed to parse Claude response as JSON: {str(e)}\nResponse: {response_text}")
         except Exception as e:
             raise Exception(f"Failed to create reproduction plan: {str(e)}")
@@ -271,8 +275,10 @@ Respond ONLY with valid JSON, no additional text or markdown.
     def __call__(self, state: AgentState) -> AgentState:
         """Execute the reproduction planner node"""
         
-        messages = state.get("messages", [])
-        errors = state.get("errors", [])
+        # Lines produced by this node only; the graph's operator.add reducer appends
+        # them to the existing history once the node returns
+        messages: List[str] = []
+        errors: List[str] = []
         
         try:
             # Get parsed issue
@@ -281,7 +287,7 @@ Respond ONLY with valid JSON, no additional text or markdown.
                 raise Exception("No parsed issue found in state")
             
             # Convert dict back to JiraIssueDetails
-            parsed_issue = JiraIssueDetails(**parsed_issue_dict)
+            parsed_issue = JiraIssueDetails.model_validate(parsed_issue_dict)
             
             # Update status
             state["status"] = "planning"
@@ -311,8 +317,9 @@ Respond ONLY with valid JSON, no additional text or markdown.
             # Show plan summary
             messages.append("\n=== Reproduction Plan ===")
             for step in plan.reproduction_steps:
+                ellipsis = "..." if len(step.description) > 80 else ""
                 messages.append(
-                    f"  Step {step.step_number}: [{step.action.upper()}] {step.description[:80]}..."
+                    f"  Step {step.step_number}: [{step.action.upper()}] {step.description[:80]}{ellipsis}"
                 )
             
             # Set next action
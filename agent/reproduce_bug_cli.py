@@ -3,6 +3,7 @@ CLI for Bug Reproduction Agent
 Enhanced command-line interface with rich formatting
 """
 import argparse
+import logging
 import sys
 from pathlib import Path
 from typing import Dict, Optional
@@ -12,11 +13,13 @@ from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.table import Table
 from rich.markdown import Markdown
 from bug_reproduction_agent import BugReproductionAgent
-import json
+import orjson
 import os
 
 console = Console()
 
+_RULE = "=" * 70
+
 
 class BugReproductionCLI:
     """Enhanced CLI for bug reproduction agent"""
@@ -122,9 +125,9 @@ class BugReproductionCLI:
     def _display_reproduction_result(self, result: Dict):
         """Display reproduction result in a formatted table"""
         
-        console.print("\n" + "="*70)
+        console.print("\n" + _RULE)
         console.print("[bold cyan]REPRODUCTION RESULT[/bold cyan]")
-        console.print("="*70)
+        console.print(_RULE)
         
         # Summary table
         table = Table(show_header=False, box=None)
@@ -183,7 +186,7 @@ class BugReproductionCLI:
             
             console.print(steps_table)
         
-        console.print("="*70)
+        console.print(_RULE)
     
     def _save_results(self, result: Dict, issue_key: str):
         """Save results to file"""
@@ -194,8 +197,9 @@ class BugReproductionCLI:
         
         # Save JSON
         output_file = results_dir / f"{issue_key}_result.json"
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(result, f, indent=2, default=str)
+        output_file.write_bytes(
+            orjson.dumps(result, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        )
         
         console.print(f"\n[green]✓[/green] Results saved to: {output_file}")
     
@@ -257,6 +261,7 @@ class BugReproductionCLI:
 
 def main():
     """Main CLI entry point"""
+    logging.basicConfig(format="%(message)s")
     
     parser = argparse.ArgumentParser(
         description="AI-powered Bug Reproduction Agent with LangGraph",
@@ -312,6 +317,14 @@ Examples:
     # Create CLI
     cli = BugReproductionCLI()
     
+    try:
+        _run_cli(cli, args, parser)
+    finally:
+        cli.agent.close()
+
+
+def _run_cli(cli: BugReproductionCLI, args: argparse.Namespace, parser: argparse.ArgumentParser):
+    """Dispatch the parsed command line arguments"""
     # Show workflow
     if args.workflow:
         console.print(cli.agent.get_workflow_diagram())
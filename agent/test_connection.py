@@ -93,6 +93,7 @@ def test_agent():
         from cli import FreeDebugAgent
         
         agent = FreeDebugAgent()
+        agent.close()
         console.print("[bold green]✅ Agent Initialized Successfully![/bold green]")
         return True
     except Exception as e:
@@ -5,7 +5,7 @@ from dotenv import load_dotenv
 from rich.console import Console
 from rich.panel import Panel
 from rich.markdown import Markdown
-from jira_client import SimpleJiraClient
+from jira_client import SimpleJiraClient, adf_to_text
 
 load_dotenv()
 console = Console()
@@ -34,7 +34,7 @@ def test_kan4():
 **Summary:** {fields.get('summary')}
 
 **Description:**
-{fields.get('description', 'No description provided')}
+{adf_to_text(fields.get('description')) or 'No description provided'}
 
 **Details:**
 - **Type:** {fields.get('issuetype', {}).get('name')}